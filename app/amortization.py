@@ -0,0 +1,139 @@
+"""
+Month-by-month amortization schedules, computed with NumPy array operations.
+
+With a monthly rate r = interest_rate / 100 / 12 and a payment P, the balance
+after k payments has the closed form
+
+    B_k = A * (1 + r)^k - P * ((1 + r)^k - 1) / r        (B_k = A - P * k if r = 0)
+
+so the whole table is a handful of vector operations over k = 1..n instead of
+a Python loop. Interest for month k is B_(k-1) * r and the principal is the
+rest of the payment. The stored payment is rounded, so the final payment is
+adjusted to bring the balance to exactly zero; if the payment would clear the
+loan early, the schedule ends in the month it is paid off.
+
+Schedules depend only on the four loan inputs, so they are cached by them
+(see schedule_cache) and shared by every loan with the same terms.
+"""
+
+from typing import Iterator
+
+import numpy as np
+
+from app.cache import LRUCache
+from app.config import settings
+from app.responses import dumps
+
+SCHEDULE_COLUMNS = ("month", "payment", "principal", "interest", "balance")
+
+# Months per NDJSON chunk when streaming a schedule
+SCHEDULE_CHUNK_MONTHS = 120
+
+# Schedules by (amount, interest_rate, length_months, monthly_payment). Entries
+# never go stale (the key is the input), so there is no invalidation or TTL.
+schedule_cache = LRUCache(settings.schedule_cache_size)
+
+
+def payoff_month(amount, interest_rate, monthly_payment):
+    """
+    Month in which the balance first reaches zero (scalars or NumPy arrays),
+    from the closed form: n = -log(1 - A * r / P) / log(1 + r), or A / P at 0%.
+    Infinite when the payment does not cover the interest. Rounded up, plus one
+    month of slack for floating-point error, so it never falls short.
+    """
+    amount = np.asarray(amount, dtype=float)
+    rate = np.asarray(interest_rate, dtype=float) / 100 / 12
+    payment = np.asarray(monthly_payment, dtype=float)
+    has_rate = rate > 0
+    safe_rate = np.where(has_rate, rate, 1.0)
+    # 1 - A * r / P, the share of the payment going to principal in month one
+    principal_share = 1 - amount * safe_rate / payment
+    with np.errstate(divide="ignore", invalid="ignore"):
+        months = np.where(
+            has_rate,
+            np.where(principal_share > 0, -np.log(principal_share) / np.log1p(safe_rate), np.inf),
+            amount / payment,
+        )
+    return np.ceil(months) + 1
+
+
+def compute_schedule(amount: float, interest_rate: float, length_months: int, monthly_payment: float) -> dict:
+    """
+    Build the amortization table for one loan.
+
+    Returns a dict of equal-length arrays keyed by SCHEDULE_COLUMNS (money
+    rounded to cents), one element per month until the loan is paid off, plus
+    "total_paid" and "total_interest" (summed before rounding).
+    """
+    rate = interest_rate / 100 / 12
+    # Only allocate up to the payoff month, however long the nominal term
+    horizon = int(min(length_months, payoff_month(amount, interest_rate, monthly_payment)))
+    months = np.arange(1, horizon + 1)
+
+    # Balance after each payment (closed form), and before it (shifted by one)
+    if rate:
+        growth = (1 + rate) ** months
+        balance = amount * growth - monthly_payment * (growth - 1) / rate
+    else:
+        balance = amount - monthly_payment * months.astype(float)
+    opening = np.concatenate(([amount], balance[:-1]))
+
+    # Stop at the month the balance reaches zero, or at the end of the term
+    paid_off = np.flatnonzero(balance <= 0)
+    last = paid_off[0] if paid_off.size else horizon - 1
+    months, opening, balance = months[:last + 1], opening[:last + 1], balance[:last + 1]
+
+    interest = opening * rate
+    principal = monthly_payment - interest
+    # The last payment settles whatever is left (rounding, early payoff, or balloon)
+    principal[-1] = opening[-1]
+    balance[-1] = 0.0
+    payment = principal + interest
+
+    schedule = {
+        "month": months,
+        "payment": np.round(payment, 2),
+        "principal": np.round(principal, 2),
+        "interest": np.round(interest, 2),
+        "balance": np.round(balance, 2),
+    }
+    for column in schedule.values():
+        column.flags.writeable = False  # shared through the cache
+    # Totals from the exact amounts, so total_paid == amount + total_interest
+    total_interest = float(interest.sum())
+    schedule["total_interest"] = round(total_interest, 2)
+    schedule["total_paid"] = round(amount + total_interest, 2)
+    return schedule
+
+
+def get_schedule(amount: float, interest_rate: float, length_months: int, monthly_payment: float) -> dict:
+    """compute_schedule() through schedule_cache"""
+    key = (amount, interest_rate, length_months, monthly_payment)
+    schedule = schedule_cache.get(key)
+    if schedule is None:
+        schedule = compute_schedule(*key)
+        schedule_cache.put(key, schedule)
+    return schedule
+
+
+def schedule_rows(schedule: dict, start: int = 0, stop: int | None = None) -> list[dict]:
+    """Months [start, stop) of a schedule as a list of row dicts"""
+    columns = [schedule[name][start:stop].tolist() for name in SCHEDULE_COLUMNS]
+    return [dict(zip(SCHEDULE_COLUMNS, values)) for values in zip(*columns)]
+
+
+def schedule_summary(loan_id: int, schedule: dict) -> dict:
+    """Totals reported alongside a schedule"""
+    return {
+        "loan_id": loan_id,
+        "months": len(schedule["month"]),
+        "total_paid": schedule["total_paid"],
+        "total_interest": schedule["total_interest"],
+    }
+
+
+def iter_schedule_ndjson(schedule: dict, chunk_months: int = SCHEDULE_CHUNK_MONTHS) -> Iterator[bytes]:
+    """Yield a schedule as NDJSON, one month per line, SCHEDULE_CHUNK_MONTHS lines per chunk"""
+    for start in range(0, len(schedule["month"]), chunk_months):
+        rows = schedule_rows(schedule, start, start + chunk_months)
+        yield b"".join(dumps(row) + b"\n" for row in rows)
@@ -0,0 +1,364 @@
+"""
+Async versions of the loan endpoints, served when LOANS_ASYNC_DB=1.
+
+They mirror the routes in main.py but run on the event loop with an async
+engine (aiosqlite for SQLite, asyncpg for Postgres) instead of in the
+threadpool. The query logic itself is shared: the helpers in crud.py run
+inside the async session through `run_sync`, which drives them over the
+async driver without blocking the loop.
+"""
+
+import logging
+from functools import partial
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app import crud, schemas
+from app.amortization import get_schedule, iter_schedule_ndjson, schedule_rows, schedule_summary
+from app.cache import loan_cache
+from app.database import AsyncSessionLocal, engine, get_async_connection, get_async_db
+from app.group_commit import run_write_async
+from app.idempotency import create_loan_with_key, idempotency_store, replay, request_fingerprint
+from app.implied_rates import AUDIT_CHUNK_SIZE, AUDIT_TOLERANCE, rate_audit_report
+from app.etag import etag_matches, list_etag, loan_etag, not_modified
+from app.export import EXPORT_CHUNK_SIZE, EXPORT_MEDIA_TYPES, aiter_export
+from app.fieldsets import LOAN_FIELDS, columns_for, parse_fields, project
+from app.filters import LoanFilters, loan_filters, parse_sort
+from app.ingest import ingest_ndjson
+from app.pagination import MAX_PAGE_SIZE, page_headers, page_position, set_next_cursor, set_total_count
+from app.payments import PaymentMismatch, check_payments
+from app.portfolio import PORTFOLIO_CHUNK_SIZE, portfolio_report, portfolio_schedule
+from app.responses import FastJSONResponse, RequestBodyStreamingResponse
+from app.stats import stats_report
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.post("/loans", response_model=schemas.LoanResponse, status_code=201)
+async def create_loan(
+    loan: schemas.LoanCreate,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: str | None = Header(None, max_length=255),
+):
+    """
+    Create a new loan with the following properties:
+    - Amount
+    - Interest rate
+    - Length of loan in months
+    - Monthly payment amount
+
+    Send an `Idempotency-Key` header to make retries safe: a repeated key returns
+    the original response instead of creating another loan.
+    """
+    logger.info(f"Creating loan: amount={loan.amount}, rate={loan.interest_rate}, months={loan.length_months}")
+    loan_dict = loan.model_dump()
+    payment_errors = check_payments([loan_dict])
+    if payment_errors:
+        logger.warning(f"Loan rejected: {payment_errors[0]['msg']}")
+        raise HTTPException(status_code=422, detail=list(payment_errors.values()))
+
+    if idempotency_key is None:
+        created = await run_write_async(db, partial(crud.create_loan, loan=loan_dict))
+        logger.info(f"Loan created successfully with ID: {created.id}")
+        return created
+
+    request_hash = request_fingerprint(loan_dict)
+    stored = await db.run_sync(idempotency_store.lookup, idempotency_key)
+    if stored is None:
+        try:
+            created, stored = await run_write_async(db, partial(
+                create_loan_with_key, loan=loan_dict, key=idempotency_key, request_hash=request_hash
+            ))
+        except IntegrityError:
+            # A concurrent request with the same key committed first
+            stored = await db.run_sync(idempotency_store.lookup, idempotency_key)
+            if stored is None:
+                raise
+        else:
+            idempotency_store.remember(idempotency_key, stored)
+            logger.info(f"Loan created successfully with ID: {created.id}")
+            return created
+
+    logger.info(f"Replaying response for Idempotency-Key: {idempotency_key}")
+    return replay(stored, request_hash)
+
+
+@router.post("/loans/batch", response_model=schemas.LoanBatchResponse, status_code=201)
+async def create_loans_batch(batch: schemas.LoanBatchCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Create many loans in a single transaction.
+
+    Every item is validated against the same rules as POST /loans. Invalid items
+    are reported by index and skipped, unless `all_or_nothing` is set, in which
+    case nothing is inserted and the errors are returned with a 422.
+    """
+    logger.info(f"Creating loan batch: size={len(batch.loans)}, all_or_nothing={batch.all_or_nothing}")
+    valid_rows, valid_indexes, errors = batch.validate_items()
+
+    if errors and batch.all_or_nothing:
+        logger.warning(f"Loan batch rejected: {len(errors)} invalid item(s)")
+        raise HTTPException(status_code=422, detail=[error.model_dump() for error in errors])
+
+    new_ids = await db.run_sync(crud.create_loans, valid_rows)
+    await db.commit()
+
+    logger.info(f"Loan batch created: {len(new_ids)} created, {len(errors)} rejected")
+    return schemas.LoanBatchResponse.from_results(len(batch.loans), valid_indexes, new_ids, errors)
+
+
+@router.post("/loans/ingest")
+async def ingest_loans(request: Request, chunk_size: int = Query(5000, ge=1, le=100_000)):
+    """
+    Create loans from an NDJSON request body (one LoanCreate object per line).
+
+    The body is read incrementally and committed every `chunk_size` lines; the
+    response streams one progress record per committed chunk (see main.py).
+    """
+    logger.info(f"Starting NDJSON ingest: chunk_size={chunk_size}")
+
+    async def progress():
+        async with AsyncSessionLocal() as db:
+            async def commit_chunk(rows: list[dict]) -> list[int]:
+                try:
+                    new_ids = await db.run_sync(crud.create_loans, rows)
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    raise
+                return new_ids
+
+            async for record in ingest_ndjson(request.stream(), chunk_size, commit_chunk):
+                yield record
+
+    return RequestBodyStreamingResponse(progress(), media_type="application/x-ndjson")
+
+
+@router.get("/loans/export")
+async def export_loans(
+    format: str = Query("ndjson", pattern="^(ndjson|json)$"),
+    chunk_size: int = Query(EXPORT_CHUNK_SIZE, ge=1, le=50_000),
+):
+    """
+    Stream every loan, ordered by ID, as NDJSON (default) or one JSON array.
+    Memory stays flat regardless of the size of the loan book.
+    """
+    logger.info(f"Exporting loans: format={format}, chunk_size={chunk_size}")
+    return StreamingResponse(aiter_export(format, chunk_size), media_type=EXPORT_MEDIA_TYPES[format])
+
+
+@router.post("/loans/lookup", response_model=schemas.LoanLookupResponse)
+async def lookup_loans(lookup: schemas.LoanLookup, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get many loans by ID in one request.
+
+    Loans are returned in the order of the requested IDs (duplicates included);
+    IDs with no loan are reported in `missing` rather than failing the call.
+    """
+    logger.info(f"Looking up {len(lookup.ids)} loan ID(s)")
+    found = await db.run_sync(crud.get_loans_by_ids, lookup.ids)
+
+    loans = [found[loan_id] for loan_id in lookup.ids if loan_id in found]
+    missing = [loan_id for loan_id in dict.fromkeys(lookup.ids) if loan_id not in found]
+
+    logger.info(f"Lookup found {len(found)} loan(s), {len(missing)} missing")
+    return schemas.LoanLookupResponse(loans=loans, missing=missing)
+
+
+@router.get("/loans/stats", response_model=schemas.LoanStats)
+async def get_loan_stats(db: AsyncSession = Depends(get_async_db)):
+    """
+    Portfolio totals: loan count, total principal, principal-weighted average
+    rate, average term, and the same per term bucket. A fixed-size read of
+    running sums (see app/stats.py).
+    """
+    return stats_report(await db.run_sync(crud.get_loan_stats))
+
+
+@router.get("/loans/{loan_id}", response_model=schemas.LoanResponse)
+async def get_loan(
+    loan_id: int,
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,monthly_payment"),
+    if_none_match: str | None = Header(None),
+    conn: AsyncConnection = Depends(get_async_connection),
+):
+    """
+    Get a loan by its unique identifier.
+
+    The response carries a strong `ETag`; send it back in `If-None-Match` to get
+    a bodyless 304 Not Modified while the loan is unchanged. Use `fields` to
+    receive (and read from the database) only some of the loan's fields.
+    """
+    logger.info(f"Retrieving loan with ID: {loan_id}")
+    fields = parse_fields(fields)
+    loan = loan_cache.get(loan_id)
+    if loan is None:
+        if if_none_match:
+            version = await conn.run_sync(crud.get_loan_version, loan_id)
+            if version is not None and etag_matches(if_none_match, loan_etag(loan_id, version, fields)):
+                return not_modified(loan_etag(loan_id, version, fields))
+
+        generation = loan_cache.generation
+        loan = await conn.run_sync(crud.get_loan_columns, loan_id, columns_for(fields or LOAN_FIELDS))
+
+        if loan is None:
+            logger.warning(f"Loan not found: ID {loan_id}")
+            raise HTTPException(status_code=404, detail="Loan not found")
+
+        if not fields:
+            loan_cache.put(loan_id, loan, generation=generation)
+
+    etag = loan_etag(loan.id, loan.version, fields)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    logger.info(f"Loan retrieved successfully: ID {loan_id}")
+    return FastJSONResponse(project(loan, fields or LOAN_FIELDS), headers={"ETag": etag})
+
+
+@router.get("/loans/{loan_id}/schedule")
+async def get_loan_schedule(
+    loan_id: int,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    conn: AsyncConnection = Depends(get_async_connection),
+):
+    """
+    Month-by-month amortization schedule of a loan: payment, principal,
+    interest and remaining balance for every month until it is paid off.
+
+    `format=ndjson` streams one month per line instead of a single JSON document.
+    """
+    logger.info(f"Building amortization schedule: ID {loan_id}, format={format}")
+    loan = loan_cache.get(loan_id) or await conn.run_sync(crud.get_loan_columns, loan_id, LOAN_FIELDS)
+    if loan is None:
+        logger.warning(f"Loan not found: ID {loan_id}")
+        raise HTTPException(status_code=404, detail="Loan not found")
+
+    schedule = get_schedule(loan.amount, loan.interest_rate, loan.length_months, loan.monthly_payment)
+    if format == "ndjson":
+        return StreamingResponse(iter_schedule_ndjson(schedule), media_type="application/x-ndjson")
+    return FastJSONResponse({**schedule_summary(loan_id, schedule), "schedule": schedule_rows(schedule)})
+
+
+@router.put("/loans/{loan_id}", response_model=schemas.LoanResponse)
+async def update_loan(
+    loan_id: int, loan: schemas.LoanUpdate, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    """Update an existing loan by its unique identifier"""
+    logger.info(f"Updating loan with ID: {loan_id}")
+    update_data = loan.model_dump(exclude_unset=True)
+    logger.info(f"Updating fields: {list(update_data.keys())}")
+
+    try:
+        updated = await run_write_async(db, partial(crud.update_loan, loan_id=loan_id, changes=update_data))
+    except PaymentMismatch as e:
+        logger.warning(f"Loan update rejected: ID {loan_id}: {e}")
+        raise HTTPException(status_code=422, detail=[e.error])
+    # The change is committed: drop any cached copy so it is never served stale
+    loan_cache.pop(loan_id)
+
+    if updated is None:
+        logger.warning(f"Loan not found for update: ID {loan_id}")
+        raise HTTPException(status_code=404, detail="Loan not found")
+
+    logger.info(f"Loan updated successfully: ID {loan_id}")
+    response.headers["ETag"] = loan_etag(updated.id, updated.version)
+    return updated
+
+
+@router.get("/loans", response_model=list[schemas.LoanResponse])
+async def list_loans(
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Page size; use /loans/export for the full book"),
+    cursor: str | None = Query(None, description="X-Next-Cursor value from the previous page"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Use cursor instead; deep offsets are slow"),
+    sort: str = Query("id", description="Column to order by, prefixed with - for descending, e.g. -amount"),
+    filters: LoanFilters = Depends(loan_filters),
+    count: str | None = Query(None, pattern="^(exact|estimated)$", description="Add an X-Total-Count header"),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,monthly_payment"),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    List loans one page at a time, ordered by ID or by `sort`, optionally
+    filtered by exact values or inclusive `_min` / `_max` ranges.
+
+    When more loans follow, the response carries an `X-Next-Cursor` header;
+    pass it back as `cursor` to fetch the next page. The page's `ETag` can be
+    sent back in `If-None-Match` for a 304 Not Modified. Use `fields` to
+    receive (and read from the database) only some fields, and `count=exact`
+    or `count=estimated` for an `X-Total-Count` header.
+    """
+    logger.info(f"Listing loans: cursor={cursor}, skip={skip}, limit={limit}, sort={sort}, filters={filters.key()}, fields={fields}")
+    sort_field, _ = parse_sort(sort)
+    after = page_position(cursor, skip, sort)
+    fields = parse_fields(fields)
+    columns = columns_for(fields or LOAN_FIELDS, sort_field)
+    loans = await db.run_sync(
+        crud.list_loans, limit + 1, skip=skip, sort=sort, after=after, columns=columns, filters=filters
+    )
+    loans = set_next_cursor(response, loans, limit, sort)
+    if count:
+        set_total_count(response, *await db.run_sync(crud.count_loans, filters, estimated=count == "estimated"))
+
+    next_cursor = response.headers.get("X-Next-Cursor")
+    etag = list_etag(loans, ";".join([next_cursor or "", ",".join(fields or ()), response.headers.get("X-Total-Count", "")]))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, page_headers(response))
+    response.headers["ETag"] = etag
+
+    logger.info(f"Retrieved {len(loans)} loans")
+    return FastJSONResponse([project(row, fields or LOAN_FIELDS) for row in loans], headers=dict(response.headers))
+
+
+def _portfolio_schedule(chunk_size: int, filters: LoanFilters) -> dict:
+    with engine.connect() as conn:
+        return portfolio_schedule(conn, chunk_size, filters)
+
+
+@router.get("/portfolio/schedule")
+async def get_portfolio_schedule(
+    chunk_size: int = Query(PORTFOLIO_CHUNK_SIZE, ge=1, le=50_000, description="Loans read per chunk"),
+    filters: LoanFilters = Depends(loan_filters),
+):
+    """
+    Aggregate month-by-month cashflow of the whole loan book (or of the loans
+    matching the GET /loans filters), amortized in vectorized blocks.
+
+    The NumPy work is CPU-bound, so it runs in the threadpool on the sync
+    engine rather than on the event loop.
+    """
+    logger.info(f"Building portfolio schedule: chunk_size={chunk_size}, filters={filters.key()}")
+    schedule = await run_in_threadpool(_portfolio_schedule, chunk_size, filters)
+    logger.info(f"Portfolio schedule built: {schedule['loans']} loans, {len(schedule['month'])} months")
+    return FastJSONResponse(portfolio_report(schedule))
+
+
+def _rate_audit_report(tolerance: float, limit: int, chunk_size: int, filters: LoanFilters) -> dict:
+    with engine.connect() as conn:
+        return rate_audit_report(conn, tolerance, limit, chunk_size, filters)
+
+
+@router.get("/portfolio/implied-rates")
+async def get_implied_rates(
+    tolerance: float = Query(AUDIT_TOLERANCE, ge=0, description="Allowed difference in percentage points"),
+    limit: int = Query(100, ge=1, le=10_000, description="Largest discrepancies to return"),
+    chunk_size: int = Query(AUDIT_CHUNK_SIZE, ge=1, le=100_000, description="Loans solved per block"),
+    filters: LoanFilters = Depends(loan_filters),
+):
+    """
+    Audit stored interest rates against the rates implied by each loan's
+    amount, term and monthly payment, solved in vectorized blocks.
+
+    Like the portfolio schedule, the NumPy work runs in the threadpool on the
+    sync engine.
+    """
+    logger.info(f"Auditing implied rates: tolerance={tolerance}, filters={filters.key()}")
+    report = await run_in_threadpool(_rate_audit_report, tolerance, limit, chunk_size, filters)
+    logger.info(f"Implied rate audit: {report['discrepancies']} discrepancies in {report['loans']} loans")
+    return FastJSONResponse(report)
@@ -0,0 +1,105 @@
+"""
+Small thread-safe in-process caches.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app.config import settings
+
+
+class LRUCache:
+    """
+    A bounded mapping that evicts the least recently used entry when full.
+    Safe to share between the request threads of one process.
+
+    Entries optionally expire `ttl` seconds after they were stored. Hit, miss,
+    eviction and expiration counters are kept for sizing the cache.
+
+    Read-through callers should take `generation` before loading a value and
+    pass it to put(): if any key was invalidated in the meantime, the possibly
+    stale value is not cached.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl or None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value (marking it recently used), or `default`"""
+        with self._lock:
+            try:
+                value, expires_at = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, generation: int | None = None) -> None:
+        """
+        Store a value, evicting the oldest entry if the cache is full.
+        If `generation` is given and an invalidation happened since it was read,
+        the value is dropped instead.
+        """
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        """Invalidate a key, and any read-through load of it still in flight"""
+        with self._lock:
+            self.generation += 1
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Counters for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Read-through cache of GET /loans/{loan_id} responses, by loan ID.
+# Writes in this process invalidate it; other worker processes only see a
+# change once their copy expires, so set a TTL when running several workers.
+loan_cache = LRUCache(settings.loan_cache_size, ttl=settings.loan_cache_ttl)
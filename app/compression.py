@@ -0,0 +1,182 @@
+"""
+Response compression negotiated from the Accept-Encoding request header.
+
+gzip is always available; zstd and brotli are offered when the optional
+`zstandard` / `brotli` packages are installed. Bodies smaller than the size
+threshold (a single loan, a 304, an error) are sent as-is. Streaming bodies
+(GET /loans/export, the POST /loans/ingest progress feed) are compressed one
+chunk at a time and flushed after each chunk, so neither the server nor the
+client has to hold the whole body.
+"""
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+# Content types worth compressing (JSON and NDJSON bodies, text)
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int = 6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        flush_mode = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(flush_mode)
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level: int = 3):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        flush_mode = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return self._compressor.compress(data) + self._compressor.flush(flush_mode)
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int = 4):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if final else self._compressor.flush())
+
+
+# Available encoders, in server preference order for equal q-values
+ENCODERS = {
+    encoder.name: encoder
+    for encoder, available in (
+        (ZstdEncoder, zstandard is not None),
+        (BrotliEncoder, brotli is not None),
+        (GzipEncoder, True),
+    )
+    if available
+}
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick the best available coding allowed by an Accept-Encoding header, or None"""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[coding.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for name in ENCODERS:
+        quality = weights.get(name, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses of at least `minimum_size` bytes"""
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await CompressionResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class CompressionResponder:
+    """Wraps `send` for one response, deciding on its first body chunk whether to compress"""
+
+    def __init__(self, app, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send = None
+        self.start_message = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message):
+        if message["type"] == "http.response.start":
+            # Hold the headers back until the first body chunk shows the size
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                message["status"] in (204, 304)
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            if not more_body and len(body) < self.minimum_size:
+                # Small, complete body: not worth compressing
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+
+            self.encoder = ENCODERS[self.encoding]()
+            body = self.encoder.compress(body, final=not more_body)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                # Streamed: the compressed length is unknown until the end
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            # The bytes differ from the identity body, so a strong ETag becomes weak
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await self.send(start)
+        else:
+            body = self.encoder.compress(body, final=not more_body)
+
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -0,0 +1,110 @@
+"""
+Application settings, read once from environment variables at startup.
+
+Every setting has a LOANS_ prefixed environment variable, e.g.
+LOANS_GROUP_COMMIT=1 turns on group commit for create/update.
+"""
+
+import os
+from dataclasses import dataclass
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return default if value is None else int(value)
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return default if value is None else float(value)
+
+
+def _env_optional_int(name: str) -> int | None:
+    value = os.environ.get(name)
+    return None if value is None else int(value)
+
+
+def _env_optional_bool(name: str) -> bool | None:
+    return None if os.environ.get(name) is None else _env_bool(name, False)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Runtime configuration for the API"""
+
+    # Database connection. Pool settings left as None use the per-dialect
+    # defaults in database.py
+    database_url: str = "sqlite:///./loans.db"
+    pool_size: int | None = None
+    max_overflow: int | None = None
+    pool_timeout: int | None = None
+    pool_recycle: int | None = None
+    pool_pre_ping: bool | None = None
+
+    # SQLite PRAGMA preset applied to every new connection (see database.py)
+    sqlite_profile: str = "balanced"
+
+    # Serve the loan endpoints with async routes and an async engine
+    async_db: bool = False
+
+    # Group commit: coalesce concurrent writes into one transaction
+    group_commit: bool = False
+    group_commit_window_ms: float = 2.0
+    group_commit_max_batch: int = 64
+    group_commit_timeout: float = 30.0  # seconds a request waits for its write before a 503
+
+    # Read-through cache for GET /loans/{loan_id} (size 0 disables, TTL 0 = no expiry)
+    loan_cache_size: int = 10_000
+    loan_cache_ttl: float = 0.0
+
+    # Idempotency-Key support for POST /loans
+    idempotency_cache_size: int = 10_000
+    idempotency_ttl_hours: float = 24.0
+
+    # Monthly payment policy on create/update: off, derive or validate (see app/payments.py)
+    payment_mode: str = "off"
+    payment_tolerance: float = 0.01
+
+    # Amortization schedules cached by loan terms (size 0 disables)
+    schedule_cache_size: int = 1024
+
+    # Accept-Encoding response compression (bodies under the minimum size are sent as-is)
+    compression: bool = True
+    compression_min_size: int = 1024
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Build settings from LOANS_* environment variables, falling back to defaults"""
+        return cls(
+            database_url=os.environ.get("LOANS_DATABASE_URL", cls.database_url),
+            pool_size=_env_optional_int("LOANS_POOL_SIZE"),
+            max_overflow=_env_optional_int("LOANS_MAX_OVERFLOW"),
+            pool_timeout=_env_optional_int("LOANS_POOL_TIMEOUT"),
+            pool_recycle=_env_optional_int("LOANS_POOL_RECYCLE"),
+            pool_pre_ping=_env_optional_bool("LOANS_POOL_PRE_PING"),
+            sqlite_profile=os.environ.get("LOANS_SQLITE_PROFILE", cls.sqlite_profile),
+            async_db=_env_bool("LOANS_ASYNC_DB", cls.async_db),
+            group_commit=_env_bool("LOANS_GROUP_COMMIT", cls.group_commit),
+            group_commit_window_ms=_env_float("LOANS_GROUP_COMMIT_WINDOW_MS", cls.group_commit_window_ms),
+            group_commit_max_batch=_env_int("LOANS_GROUP_COMMIT_MAX_BATCH", cls.group_commit_max_batch),
+            group_commit_timeout=_env_float("LOANS_GROUP_COMMIT_TIMEOUT", cls.group_commit_timeout),
+            loan_cache_size=_env_int("LOANS_CACHE_SIZE", cls.loan_cache_size),
+            loan_cache_ttl=_env_float("LOANS_CACHE_TTL", cls.loan_cache_ttl),
+            idempotency_cache_size=_env_int("LOANS_IDEMPOTENCY_CACHE_SIZE", cls.idempotency_cache_size),
+            idempotency_ttl_hours=_env_float("LOANS_IDEMPOTENCY_TTL_HOURS", cls.idempotency_ttl_hours),
+            payment_mode=os.environ.get("LOANS_PAYMENT_MODE", cls.payment_mode),
+            payment_tolerance=_env_float("LOANS_PAYMENT_TOLERANCE", cls.payment_tolerance),
+            schedule_cache_size=_env_int("LOANS_SCHEDULE_CACHE_SIZE", cls.schedule_cache_size),
+            compression=_env_bool("LOANS_COMPRESSION", cls.compression),
+            compression_min_size=_env_int("LOANS_COMPRESSION_MIN_SIZE", cls.compression_min_size),
+        )
+
+
+settings = Settings.from_env()
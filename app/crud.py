@@ -0,0 +1,323 @@
+"""
+Database operations for loans.
+
+Route handlers in main.py stay thin and call these helpers, so the same
+query logic can be reused by every endpoint that reads or writes loans.
+"""
+
+from functools import lru_cache
+
+from sqlalchemy import and_, bindparam, case, func, insert, or_, select, tuple_, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models, payments, schemas, stats
+from app.filters import LoanFilters
+
+# IDs per "WHERE id IN (...)" query; keeps each statement well under the
+# bound-parameter limits of SQLite and Postgres
+LOOKUP_CHUNK_SIZE = 500
+
+# Every column of the loans table, used with RETURNING to read back a written
+# row in the same statement instead of a follow-up SELECT (db.refresh)
+LOAN_COLUMNS = tuple(models.Loan.__table__.c)
+
+# Estimated counts sample this many evenly spaced id windows of this many ids
+ESTIMATE_WINDOWS = 16
+ESTIMATE_WINDOW_SIZE = 250
+
+
+def create_loan(db: Session, loan: dict) -> schemas.LoanResponse:
+    """
+    Insert one loan with INSERT ... RETURNING, without committing. The
+    loan_stats sums are updated by a trigger (see app/stats.py).
+
+    Returns a LoanResponse rather than the ORM object so the result is still
+    usable after the session that created it is closed (see group_commit.py).
+    """
+    stmt = insert(models.Loan).values(**loan).returning(*LOAN_COLUMNS)
+    row = db.execute(stmt).mappings().one()
+    return schemas.LoanResponse.model_validate(dict(row))
+
+
+def update_loan(db: Session, loan_id: int, changes: dict) -> schemas.LoanResponse | None:
+    """
+    Apply a partial update to one loan without committing.
+
+    The changes go straight into a single UPDATE ... WHERE id = ? RETURNING,
+    so an update costs one statement; a missing loan simply matches zero rows.
+    The row's version is bumped so its ETag changes, and a trigger moves the
+    loan's contribution to the loan_stats sums (see app/stats.py). When the
+    payment mode (app/payments.py) needs the current values, the row is
+    locked and read first (see lock_loan); a rejected payment raises
+    PaymentMismatch.
+    Returns None if the loan does not exist.
+    """
+    current = None
+    if changes and payments.update_needs_check(changes):
+        # The payment depends on the old values: lock the row and read them,
+        # so no other write can change them before commit
+        current = lock_loan(db, loan_id)
+        if current is None:
+            return None
+        changes = payments.resolve_update(current, changes)
+
+    if changes:
+        # lock_loan already bumped the version
+        version = {} if current is not None else {"version": models.Loan.version + 1}
+        stmt = (
+            update(models.Loan)
+            .where(models.Loan.id == loan_id)
+            .values(**changes, **version)
+            .returning(*LOAN_COLUMNS)
+        )
+    else:
+        # Nothing to change: just read the current row back
+        stmt = select(*LOAN_COLUMNS).where(models.Loan.id == loan_id)
+
+    row = db.execute(stmt).mappings().first()
+    if row is None:
+        return None
+    return schemas.LoanResponse.model_validate(dict(row))
+
+
+def lock_loan(db: Session, loan_id: int) -> dict | None:
+    """
+    Lock one loan until the transaction ends and return its current columns
+    as a dict (None if it does not exist). Bumps the row's version.
+
+    This is an UPDATE ... RETURNING rather than SELECT ... FOR UPDATE: SQLite
+    ignores FOR UPDATE, and pysqlite only opens the transaction at the first
+    write, so a SELECT would read outside it. A write statement takes SQLite's
+    database write lock (or the row lock elsewhere) before it reads the row,
+    so concurrent updates of the same loan are serialized.
+    """
+    stmt = (
+        update(models.Loan)
+        .where(models.Loan.id == loan_id)
+        .values(version=models.Loan.version + 1)
+        .returning(*LOAN_COLUMNS)
+    )
+    row = db.execute(stmt).mappings().first()
+    return dict(row) if row is not None else None
+
+
+def get_loan(db: Session, loan_id: int) -> models.Loan | None:
+    """Fetch one loan by ID, or None if it does not exist"""
+    return db.query(models.Loan).filter(models.Loan.id == loan_id).first()
+
+
+def get_loan_version(db: Session | Connection, loan_id: int) -> int | None:
+    """Fetch only the version of one loan (an index-only read), or None if it does not exist"""
+    return db.scalar(select(models.Loan.version).where(models.Loan.id == loan_id))
+
+
+def get_loans_by_ids(db: Session, ids: list[int]) -> dict[int, models.Loan]:
+    """
+    Fetch many loans by ID with WHERE id IN (...) queries, chunked for large ID sets.
+    Returns a mapping of ID to loan; IDs that don't exist are absent.
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    found = {}
+    for start in range(0, len(unique_ids), LOOKUP_CHUNK_SIZE):
+        chunk = unique_ids[start:start + LOOKUP_CHUNK_SIZE]
+        for loan in db.query(models.Loan).filter(models.Loan.id.in_(chunk)):
+            found[loan.id] = loan
+    return found
+
+
+@lru_cache(maxsize=128)
+def loan_by_id_query(columns: tuple[str, ...]):
+    """
+    SELECT <columns> FROM loans WHERE id = :loan_id, built once per column set.
+
+    Reusing the same statement object with a bound parameter lets SQLAlchemy
+    skip rebuilding it and hit its compiled-SQL cache on every call.
+    """
+    selected = (getattr(models.Loan, name) for name in columns)
+    return select(*selected).where(models.Loan.id == bindparam("loan_id"))
+
+
+def get_loan_columns(db: Session | Connection, loan_id: int, columns: list[str]):
+    """
+    Fetch only the named columns of one loan as a Row, or None if it does not exist.
+    Works on a Session or directly on a Core Connection (see get_connection).
+    """
+    return db.execute(loan_by_id_query(tuple(columns)), {"loan_id": loan_id}).first()
+
+
+def list_loans(
+    db: Session,
+    limit: int,
+    skip: int = 0,
+    sort: str = "id",
+    after: tuple | None = None,
+    columns: list[str] | None = None,
+    filters: LoanFilters | None = None,
+) -> list:
+    """
+    Fetch a page of loans ordered by (sort, id), optionally filtered.
+
+    `sort` is a column name, prefixed with "-" for descending order. `after`
+    is the (sort value, id) of the previous page's last row; the page then
+    starts with a keyset seek past it. `skip` is the legacy OFFSET fallback,
+    which gets slower the deeper the page.
+
+    Returns Loan objects, or, when `columns` is given, Rows with only those
+    columns (the SELECT itself is narrowed).
+    """
+    field = sort.removeprefix("-")
+    descending = sort.startswith("-")
+    sort_column = getattr(models.Loan, field)
+    if columns is None:
+        stmt = select(models.Loan)
+    else:
+        stmt = select(*(getattr(models.Loan, name) for name in columns))
+
+    if filters is not None:
+        stmt = stmt.where(*filters.conditions())
+
+    # Seek past the previous page in the same direction as the ORDER BY
+    if field == "id":
+        if after is not None:
+            stmt = stmt.where(models.Loan.id < after[1] if descending else models.Loan.id > after[1])
+        order_by = [models.Loan.id]
+    else:
+        if after is not None:
+            position = tuple_(sort_column, models.Loan.id)
+            stmt = stmt.where(position < tuple_(*after) if descending else position > tuple_(*after))
+        order_by = [sort_column, models.Loan.id]
+    if descending:
+        order_by = [column.desc() for column in order_by]
+    stmt = stmt.order_by(*order_by)
+
+    stmt = stmt.offset(skip).limit(limit)
+    if columns is None:
+        return list(db.scalars(stmt))
+    return list(db.execute(stmt))
+
+
+def create_loans(db: Session, loans: list[dict]) -> list[int]:
+    """
+    Insert many loans with a single executemany-style INSERT ... RETURNING.
+
+    The caller owns the transaction (commit/rollback); a trigger adds each
+    row to the loan_stats sums. Returns the generated IDs in the same order
+    as `loans`.
+    """
+    if not loans:
+        return []
+
+    # sort_by_parameter_order=True guarantees the returned IDs line up with
+    # the input rows, even when SQLAlchemy splits them into several batches
+    stmt = insert(models.Loan).returning(models.Loan.id, sort_by_parameter_order=True)
+    return list(db.scalars(stmt, loans))
+
+
+def get_loan_stats(db: Session) -> dict[str, dict]:
+    """The loan_stats rows as {bucket: {sum: value}}; one small read, whatever the number of loans"""
+    rows = db.execute(select(models.LoanStat.bucket, *(getattr(models.LoanStat, name) for name in stats.STATS_SUMS)))
+    return {bucket: dict(zip(stats.STATS_SUMS, sums)) for bucket, *sums in rows}
+
+
+def rebuild_loan_stats(db: Session) -> dict[str, dict]:
+    """
+    Recompute the loan_stats rows from the loans table with one GROUP BY
+    aggregate, without committing. Returns the new rows as get_loan_stats() does.
+
+    The stats rows are locked first with a no-op UPDATE (like lock_loan, a
+    write takes SQLite's write lock before reading, where SELECT ... FOR
+    UPDATE would be ignored), so the aggregate runs inside the write
+    transaction: concurrent loan writes either committed before it and are
+    counted, or wait and their triggers apply the delta on top of the
+    rebuilt values.
+    """
+    lock = update(models.LoanStat).values(loans=models.LoanStat.loans).returning(models.LoanStat.bucket)
+    existing = set(db.scalars(lock))
+
+    bucket = stats.term_bucket_column().label("bucket")
+    aggregate = select(
+        bucket,
+        func.count(),
+        func.coalesce(func.sum(models.Loan.amount), 0.0),
+        func.coalesce(func.sum(models.Loan.amount * models.Loan.interest_rate), 0.0),
+        func.coalesce(func.sum(models.Loan.length_months), 0),
+    ).group_by(bucket)
+    computed = {name: dict(zip(stats.STATS_SUMS, sums)) for name, *sums in db.execute(aggregate)}
+
+    rebuilt = {}
+    for name, _, _ in stats.TERM_BUCKETS:
+        sums = rebuilt[name] = computed.get(name, dict.fromkeys(stats.STATS_SUMS, 0))
+        if name in existing:
+            db.execute(update(models.LoanStat).where(models.LoanStat.bucket == name).values(**sums))
+        else:
+            db.execute(insert(models.LoanStat).values(bucket=name, **sums))
+    return rebuilt
+
+
+def init_loan_stats(db: Session) -> int:
+    """
+    Build the loan_stats rows with a one-time aggregate if they do not exist
+    yet (new or pre-stats database), and commit. Returns the number of loans.
+    """
+    if db.scalar(select(func.count()).select_from(models.LoanStat)) != len(stats.TERM_BUCKETS):
+        try:
+            rebuild_loan_stats(db)
+            db.commit()
+        except IntegrityError:
+            # Another worker built them first
+            db.rollback()
+    return get_loan_total(db)
+
+
+def get_loan_total(db: Session) -> int | None:
+    """Number of loans, summed from the loan_stats buckets (a few rows), or None if they are missing"""
+    return db.scalar(select(func.sum(models.LoanStat.loans)))
+
+
+def count_loans(db: Session, filters: LoanFilters | None = None, estimated: bool = False) -> tuple[int, bool]:
+    """
+    Count the loans matching `filters`. Returns (count, is_estimate).
+
+    Without filters the loan_stats buckets answer exactly. Filtered counts run
+    COUNT(*) with the filters, which the filter indexes turn into an index
+    range count; with `estimated=True` a sample of id windows is counted
+    instead and scaled up, which costs the same however large the table.
+    """
+    conditions = filters.conditions() if filters is not None else []
+    if not conditions:
+        total = get_loan_total(db)
+        if total is not None:
+            return total, False
+    elif estimated:
+        estimate = estimate_loan_count(db, conditions)
+        if estimate is not None:
+            return estimate, True
+    return db.scalar(select(func.count()).select_from(models.Loan).where(*conditions)), False
+
+
+def estimate_loan_count(db: Session, conditions: list) -> int | None:
+    """
+    Estimate how many loans match `conditions` from ESTIMATE_WINDOWS evenly
+    spaced windows of ids (primary key range scans). Returns None when the
+    table is small enough that an exact count is just as cheap.
+    """
+    # Separate queries: SQLite only answers a lone MIN() or MAX() from the index
+    low = db.scalar(select(func.min(models.Loan.id)))
+    high = db.scalar(select(func.max(models.Loan.id)))
+    total = get_loan_total(db)
+    if low is None or total is None or high - low + 1 <= ESTIMATE_WINDOWS * ESTIMATE_WINDOW_SIZE:
+        return None
+
+    step = (high - low + 1) // ESTIMATE_WINDOWS
+    windows = [
+        models.Loan.id.between(start, start + ESTIMATE_WINDOW_SIZE - 1)
+        for start in range(low, low + step * ESTIMATE_WINDOWS, step)
+    ]
+    sampled, matched = db.execute(
+        select(func.count(), func.sum(case((and_(*conditions), 1), else_=0))).where(or_(*windows))
+    ).one()
+    if not sampled:
+        return None
+    return round(total * matched / sampled)
@@ -1,12 +1,134 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# SQLite database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./loans.db"
+from app.config import settings
+
+# Database URL (LOANS_DATABASE_URL), SQLite by default. Hosting providers often
+# hand out "postgres://" URLs, which SQLAlchemy only accepts as "postgresql://"
+SQLALCHEMY_DATABASE_URL = settings.database_url.replace("postgres://", "postgresql://", 1)
+
+# Connection pool defaults per database, overridable with LOANS_POOL_* settings.
+# SQLite connections are cheap and local, but the sync endpoints run in a
+# 40-thread pool, so allow enough of them that threads don't queue for one.
+# Postgres connections are expensive server processes: keep fewer, recycle them
+# before server/proxy idle timeouts, and ping them before use.
+POOL_DEFAULTS = {
+    "sqlite": {"pool_size": 20, "max_overflow": 20, "pool_timeout": 30, "pool_recycle": -1, "pool_pre_ping": False},
+    "postgresql": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 30, "pool_recycle": 1800, "pool_pre_ping": True},
+}
+GENERIC_POOL_DEFAULTS = {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30, "pool_recycle": 3600, "pool_pre_ping": True}
+
+# Async drivers for each database, used when LOANS_ASYNC_DB=1
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+# SQLite PRAGMA presets, chosen with LOANS_SQLITE_PROFILE:
+# - durable:   WAL + synchronous=FULL, every commit survives power loss
+# - balanced:  WAL + synchronous=NORMAL, safe against app crashes; a power loss
+#              can drop the last few commits, never corrupt the database
+# - bulk-load: synchronous=OFF and big caches, for one-off migrations only
+# - default:   leave SQLite's own defaults (rollback journal, synchronous=FULL)
+# WAL lets readers keep reading while a writer commits.
+SQLITE_PROFILES = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16_000,        # negative = KiB, i.e. 16 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5_000,        # ms to wait for a lock before "database is locked"
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024**2,
+        "cache_size": -64_000,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5_000,
+    },
+    "bulk-load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "mmap_size": 1024**3,
+        "cache_size": -256_000,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30_000,
+    },
+    "default": {},
+}
+
+
+def apply_sqlite_profile(engine, profile: str) -> None:
+    """Run the PRAGMAs of a SQLITE_PROFILES preset on every new connection of `engine`"""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile '{profile}', expected one of {sorted(SQLITE_PROFILES)}")
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = SQLITE_PROFILES[profile]
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def engine_options(url: str) -> dict:
+    """Keyword arguments for create_engine: per-dialect pool defaults plus LOANS_POOL_* overrides"""
+    parsed = make_url(url)
+    dialect = parsed.get_dialect().name
+
+    if dialect == "sqlite":
+        options = {"connect_args": {"check_same_thread": False}}
+        if parsed.database in (None, "", ":memory:"):
+            # An in-memory database lives inside one connection, so every
+            # thread must share that connection instead of using a sized pool
+            options["poolclass"] = StaticPool
+            return options
+    else:
+        options = {}
+
+    overrides = {
+        "pool_size": settings.pool_size,
+        "max_overflow": settings.max_overflow,
+        "pool_timeout": settings.pool_timeout,
+        "pool_recycle": settings.pool_recycle,
+        "pool_pre_ping": settings.pool_pre_ping,
+    }
+    for name, default in POOL_DEFAULTS.get(dialect, GENERIC_POOL_DEFAULTS).items():
+        options[name] = default if overrides[name] is None else overrides[name]
+    return options
+
+
+def pool_status(engine) -> dict:
+    """Live pool counters, for sizing the pool from evidence"""
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if not hasattr(pool, "checkedout"):
+        return status  # e.g. StaticPool: one shared connection, nothing to size
+
+    status.update({
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # QueuePool counts overflow from -size; only connections beyond size are overflow
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "timeout": pool.timeout(),
+    })
+    return status
+
 
 # Create database engine
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+apply_sqlite_profile(engine, settings.sqlite_profile)
 
 # Create session local class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -14,6 +136,27 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create base class for models
 Base = declarative_base()
 
+
+def async_database_url(url: str) -> str:
+    """Swap the driver in a database URL for its async equivalent"""
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database '{dialect}'")
+    return f"{ASYNC_DRIVERS[dialect]}://{rest}"
+
+
+# Async engine and sessions, only created in async mode so the async drivers
+# (aiosqlite / asyncpg) are not needed otherwise
+async_engine = None
+AsyncSessionLocal = None
+if settings.async_db:
+    async_url = async_database_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(async_url, **engine_options(async_url))
+    apply_sqlite_profile(async_engine.sync_engine, settings.sqlite_profile)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
@@ -21,3 +164,22 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency to get an async database session (async mode)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependency to get a bare pooled connection, for read-only routes that
+# don't need a Session (no identity map or ORM bookkeeping)
+def get_connection():
+    with engine.connect() as conn:
+        yield conn
+
+
+# Async version of get_connection (async mode)
+async def get_async_connection():
+    async with async_engine.connect() as conn:
+        yield conn
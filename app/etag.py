@@ -0,0 +1,49 @@
+"""
+Strong ETags and If-None-Match handling for loan resources.
+
+Every loan row carries a `version` that is bumped on each update, so a single
+loan's ETag is known from (id, version) alone, without loading or serializing
+the rest of the row. A list page's ETag is a hash over the (id, version) pairs
+of the loans on it.
+"""
+
+import hashlib
+import re
+
+from fastapi import Response
+
+# One entity-tag in an If-None-Match list; a quoted tag may itself contain
+# commas (a sparse fieldset's ETag does), so the list is not split on them
+ENTITY_TAG = re.compile(r'(?:W/)?("[^"]*")')
+
+
+def loan_etag(loan_id: int, version: int, fields: list[str] | None = None) -> str:
+    """Strong ETag of a single loan representation (full, or a sparse fieldset)"""
+    if fields:
+        return f'"{loan_id}.{version};{",".join(fields)}"'
+    return f'"{loan_id}.{version}"'
+
+
+def list_etag(loans: list, extra: str = "") -> str:
+    """Strong ETag of a page of loans; `extra` covers anything else in the response"""
+    digest = hashlib.sha256(extra.encode())
+    for loan in loans:
+        digest.update(f"{loan.id}.{loan.version},".encode())
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    True if an If-None-Match header matches `etag`.
+    If-None-Match uses weak comparison, so W/"x" matches "x".
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in ENTITY_TAG.findall(if_none_match)
+
+
+def not_modified(etag: str, headers: dict | None = None) -> Response:
+    """A bodyless 304 response for an unchanged resource"""
+    return Response(status_code=304, headers={**(headers or {}), "ETag": etag})
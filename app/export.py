@@ -0,0 +1,61 @@
+"""
+Constant-memory export of the whole loan book for GET /loans/export.
+
+Rows are read through a streaming cursor (`yield_per`), serialized a chunk at
+a time, and handed to a StreamingResponse, so server memory depends on the
+chunk size rather than on the number of loans.
+"""
+
+from typing import AsyncIterator, Iterator
+
+from sqlalchemy import select
+
+from app import models
+from app.crud import LOAN_COLUMNS
+from app.database import async_engine, engine
+from app.responses import dumps
+
+# Rows fetched from the database and serialized per chunk
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+EXPORT_QUERY = select(*LOAN_COLUMNS).order_by(models.Loan.id)
+
+
+def _serialize_chunk(rows, fmt: str, first: bool) -> bytes:
+    # Same compact encoder (orjson when installed) as the other loan responses
+    if fmt == "ndjson":
+        return b"".join(dumps(dict(row)) + b"\n" for row in rows)
+    # JSON array: every chunk but the first starts with the separating comma
+    body = b",".join(dumps(dict(row)) for row in rows)
+    return body if first else b"," + body
+
+
+def iter_export(fmt: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the serialized loan book chunk by chunk (sync engine)"""
+    if fmt == "json":
+        yield b"["
+    with engine.connect() as conn:
+        result = conn.execute(EXPORT_QUERY.execution_options(yield_per=chunk_size))
+        for index, rows in enumerate(result.mappings().partitions()):
+            yield _serialize_chunk(rows, fmt, first=index == 0)
+    if fmt == "json":
+        yield b"]"
+
+
+async def aiter_export(fmt: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield the serialized loan book chunk by chunk (async engine)"""
+    if fmt == "json":
+        yield b"["
+    async with async_engine.connect() as conn:
+        result = await conn.stream(EXPORT_QUERY.execution_options(yield_per=chunk_size))
+        index = 0
+        async for rows in result.mappings().partitions():
+            yield _serialize_chunk(rows, fmt, first=index == 0)
+            index += 1
+    if fmt == "json":
+        yield b"]"
@@ -0,0 +1,40 @@
+"""
+Sparse fieldsets (?fields=id,monthly_payment) for the loan read endpoints.
+
+The requested fields are pushed down into the SQL SELECT, and the response is
+built straight from the selected row values instead of a full LoanResponse.
+"""
+
+from fastapi import HTTPException
+
+from app import schemas
+
+# Fields a client may ask for, in response order
+LOAN_FIELDS = tuple(schemas.LoanResponse.model_fields)
+
+# Always selected because the server needs them for ETags and page cursors
+REQUIRED_COLUMNS = ("id", "version")
+
+
+def parse_fields(fields: str | None) -> list[str] | None:
+    """Parse a comma-separated `fields` parameter; None means all fields"""
+    if fields is None:
+        return None
+    requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in LOAN_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown or empty fields {unknown}; choose from {list(LOAN_FIELDS)}",
+        )
+    return requested
+
+
+def columns_for(fields: list[str], *extra: str) -> list[str]:
+    """Columns to SELECT for `fields`, plus the ones the server needs itself"""
+    return list(dict.fromkeys([*fields, *REQUIRED_COLUMNS, *extra]))
+
+
+def project(row, fields: list[str]) -> dict:
+    """Pick `fields` out of a row (attribute access) as a response dict"""
+    return {name: getattr(row, name) for name in fields}
@@ -0,0 +1,88 @@
+"""
+Server-side filtering and sorting for GET /loans.
+
+Every numeric loan column can be matched exactly (`length_months=360`) or by
+range (`interest_rate_min=4&interest_rate_max=5`); bounds are inclusive. The
+`sort` parameter names a column, with a leading `-` for descending order.
+Ties are always broken by id, so (sort column, id) is a unique keyset order
+that the cursor can resume from and the composite indexes on `loans` cover.
+"""
+
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Query
+
+from app import models
+
+# Columns that can be filtered on and sorted by
+FILTER_FIELDS = ("amount", "interest_rate", "length_months", "monthly_payment")
+SORT_FIELDS = ("id", *FILTER_FIELDS)
+
+
+@dataclass(frozen=True)
+class LoanFilters:
+    """Equality and inclusive range conditions on the loan columns"""
+    amount: float | None = None
+    amount_min: float | None = None
+    amount_max: float | None = None
+    interest_rate: float | None = None
+    interest_rate_min: float | None = None
+    interest_rate_max: float | None = None
+    length_months: int | None = None
+    length_months_min: int | None = None
+    length_months_max: int | None = None
+    monthly_payment: float | None = None
+    monthly_payment_min: float | None = None
+    monthly_payment_max: float | None = None
+
+    def conditions(self) -> list:
+        """SQLAlchemy WHERE clauses for the filters that are set"""
+        clauses = []
+        for name in FILTER_FIELDS:
+            column = getattr(models.Loan, name)
+            equal, low, high = (getattr(self, name), getattr(self, f"{name}_min"), getattr(self, f"{name}_max"))
+            if equal is not None:
+                clauses.append(column == equal)
+            if low is not None:
+                clauses.append(column >= low)
+            if high is not None:
+                clauses.append(column <= high)
+        return clauses
+
+    def key(self) -> str:
+        """Stable text form of the set filters (for ETags and logging)"""
+        return "&".join(f"{name}={value}" for name, value in vars(self).items() if value is not None)
+
+
+def loan_filters(
+    amount: float | None = Query(None, description="Exact amount"),
+    amount_min: float | None = Query(None, description="Minimum amount (inclusive)"),
+    amount_max: float | None = Query(None, description="Maximum amount (inclusive)"),
+    interest_rate: float | None = Query(None, description="Exact interest rate, in percent"),
+    interest_rate_min: float | None = Query(None, description="Minimum interest rate (inclusive)"),
+    interest_rate_max: float | None = Query(None, description="Maximum interest rate (inclusive)"),
+    length_months: int | None = Query(None, description="Exact term in months, e.g. 360"),
+    length_months_min: int | None = Query(None, description="Minimum term in months (inclusive)"),
+    length_months_max: int | None = Query(None, description="Maximum term in months (inclusive)"),
+    monthly_payment: float | None = Query(None, description="Exact monthly payment"),
+    monthly_payment_min: float | None = Query(None, description="Minimum monthly payment (inclusive)"),
+    monthly_payment_max: float | None = Query(None, description="Maximum monthly payment (inclusive)"),
+) -> LoanFilters:
+    """Dependency collecting the filter query parameters of GET /loans"""
+    return LoanFilters(
+        amount, amount_min, amount_max,
+        interest_rate, interest_rate_min, interest_rate_max,
+        length_months, length_months_min, length_months_max,
+        monthly_payment, monthly_payment_min, monthly_payment_max,
+    )
+
+
+def parse_sort(sort: str) -> tuple[str, bool]:
+    """Split a `sort` parameter into (column name, descending), rejecting unknown columns with a 400"""
+    field = sort.removeprefix("-")
+    if field not in SORT_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot sort by {field!r}; choose from {list(SORT_FIELDS)} (prefix with - for descending)",
+        )
+    return field, sort.startswith("-")
@@ -0,0 +1,243 @@
+"""
+Group commit: many concurrent writes, one transaction, one fsync.
+
+Request threads hand a write operation to a single writer thread and block
+until it is durable. The writer collects operations for up to `window_ms`
+(or until `max_batch` are pending), runs them all in one session, and commits
+once. Each operation runs inside its own SAVEPOINT, so an operation that
+raises (a duplicate Idempotency-Key, a rejected payment) is rolled back and
+fails alone while the rest of the batch still commits together.
+
+Callers wait at most `timeout` seconds for their write, and get
+GroupCommitUnavailable (503) rather than hanging when the writer thread is
+not running.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Queue sentinel asking the writer thread to stop
+_STOP = object()
+
+
+class GroupCommitUnavailable(RuntimeError):
+    """The writer thread is not running, or did not commit a write in time"""
+
+
+class GroupCommitter:
+    """
+    Coalesces write operations from many threads into shared transactions.
+
+    An operation is a callable that takes a Session, performs its writes
+    (without committing) and returns a value that is safe to use after the
+    session is closed.
+    """
+
+    def __init__(
+        self, session_factory: sessionmaker, window_ms: float = 2.0, max_batch: int = 64, timeout: float = 30.0
+    ):
+        self._session_factory = session_factory
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._writes = 0
+        self._max_batch_seen = 0
+        self._failed_writes = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_commit = 0.0
+
+    def start(self) -> None:
+        """Start the writer thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Flush everything already submitted, then stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, operation: Callable[[Session], T]) -> Future:
+        """
+        Queue an operation; the future resolves once its transaction has
+        committed. Raises GroupCommitUnavailable if the writer is not running.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            raise GroupCommitUnavailable("Group commit writer is not running")
+        future = Future()
+        self._queue.put((operation, future, time.perf_counter()))
+        return future
+
+    def run(self, operation: Callable[[Session], T]) -> T:
+        """Queue an operation and block until it is durable (at most `timeout` seconds), returning its result"""
+        future = self.submit(operation)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Still queued: make sure it never runs. Already running: it may still commit.
+            future.cancel()
+            raise GroupCommitUnavailable(f"Write not committed within {self.timeout}s") from None
+
+    def stats(self) -> dict:
+        """Batch size and latency counters, for tuning the window"""
+        with self._stats_lock:
+            batches = self._batches or 1
+            writes = self._writes or 1
+            return {
+                "enabled": True,
+                "window_ms": self._window * 1000,
+                "max_batch": self._max_batch,
+                "batches": self._batches,
+                "writes": self._writes,
+                "avg_batch_size": self._writes / batches,
+                "max_batch_size": self._max_batch_seen,
+                "failed_writes": self._failed_writes,
+                "avg_wait_ms": self._total_wait / writes * 1000,
+                "max_wait_ms": self._max_wait * 1000,
+                "avg_commit_ms": self._total_commit / batches * 1000,
+                "pending": self._queue.qsize(),
+            }
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            # Collect more operations until the window closes or the batch is full
+            batch = [item]
+            deadline = time.perf_counter() + self._window
+            while len(batch) < self._max_batch:
+                timeout = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                self._flush(batch)
+            except Exception as e:
+                # Keep the writer alive; fail whatever this batch left unresolved
+                logger.exception("Group commit writer failed a batch")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _flush(self, batch: list) -> None:
+        started = time.perf_counter()
+        # Operations whose caller gave up (cancelled) while queued are dropped
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        waits = [started - enqueued for _, _, enqueued in batch]
+
+        outcomes = []  # (future, result, exception) per operation
+        db = self._session_factory()
+        try:
+            if db.get_bind().dialect.name == "sqlite":
+                # pysqlite only BEGINs before DML, so the first SAVEPOINT would
+                # open the transaction itself and its RELEASE would commit it
+                db.connection().exec_driver_sql("BEGIN")
+            for operation, future, _ in batch:
+                try:
+                    with db.begin_nested():
+                        outcomes.append((future, operation(db), None))
+                except Exception as e:
+                    outcomes.append((future, None, e))
+            db.commit()
+        except Exception as e:
+            # The shared commit itself failed: no operation is durable
+            db.rollback()
+            logger.warning(f"Group commit of {len(batch)} writes failed: {e}")
+            outcomes = [(future, None, e) for _, future, _ in batch]
+        finally:
+            db.close()
+
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+        with self._stats_lock:
+            self._batches += 1
+            self._writes += len(batch)
+            self._max_batch_seen = max(self._max_batch_seen, len(batch))
+            self._failed_writes += sum(error is not None for _, _, error in outcomes)
+            self._total_wait += sum(waits)
+            self._max_wait = max(self._max_wait, *waits)
+            self._total_commit += time.perf_counter() - started
+
+
+# Shared writer for the process (LOANS_GROUP_COMMIT=1), or None when disabled
+group_committer = (
+    GroupCommitter(
+        SessionLocal, settings.group_commit_window_ms, settings.group_commit_max_batch, settings.group_commit_timeout
+    )
+    if settings.group_commit else None
+)
+
+
+def run_write(db: Session, operation: Callable[[Session], T]) -> T:
+    """
+    Run a write operation and make it durable.
+
+    With group commit enabled the operation is handed to the shared writer and
+    this call returns once its batch has committed; otherwise it runs in the
+    request's own session and commits immediately.
+    """
+    if group_committer is not None:
+        return group_committer.run(operation)
+
+    try:
+        result = operation(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result
+
+
+async def run_write_async(db: AsyncSession, operation: Callable[[Session], T]) -> T:
+    """Async counterpart of run_write, for the async request path"""
+    if group_committer is not None:
+        future = group_committer.submit(operation)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), group_committer.timeout)
+        except asyncio.TimeoutError:
+            raise GroupCommitUnavailable(f"Write not committed within {group_committer.timeout}s") from None
+
+    try:
+        result = await db.run_sync(operation)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return result
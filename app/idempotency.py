@@ -0,0 +1,132 @@
+"""
+Idempotency-Key support for POST /loans.
+
+A retried request carrying the same key gets the original response back
+instead of creating a duplicate loan. Keys live in two places:
+- a bounded in-process LRU for the hot retry window
+- the idempotency_keys table, for durability across restarts and workers
+
+The table row is written in the same transaction as the loan, so a key is
+stored if and only if its loan was created. Keys expire
+LOANS_IDEMPOTENCY_TTL_HOURS after they were stored: lookups ignore (and
+delete) expired keys, and startup purges them in bulk.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, Response
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.cache import LRUCache
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """The original response recorded for an idempotency key"""
+    request_hash: str
+    status_code: int
+    body: str
+    created_at: datetime  # naive UTC, like the table's server default
+
+
+def utcnow() -> datetime:
+    """Current time as naive UTC, comparable with idempotency_keys.created_at"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def request_fingerprint(payload: dict) -> str:
+    """Stable hash of a request body, to detect a key reused for a different request"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """Two-level (LRU + table) store of responses by idempotency key"""
+
+    def __init__(self, cache_size: int, ttl: timedelta):
+        self._cache = LRUCache(cache_size)
+        self.ttl = ttl
+
+    def lookup(self, db: Session, key: str) -> StoredResponse | None:
+        """
+        Find the unexpired stored response for a key: LRU first, then a
+        primary-key read. An expired key is deleted (and committed) so the
+        request can claim it again.
+        """
+        cutoff = utcnow() - self.ttl
+        stored = self._cache.get(key)
+        if stored is None:
+            stmt = select(
+                models.IdempotencyKey.request_hash,
+                models.IdempotencyKey.status_code,
+                models.IdempotencyKey.response_body,
+                models.IdempotencyKey.created_at,
+            ).where(models.IdempotencyKey.key == key)
+            row = db.execute(stmt).first()
+            if row is None:
+                return None
+            stored = StoredResponse(*row)
+
+        if stored.created_at < cutoff:
+            self._cache.pop(key)
+            db.execute(delete(models.IdempotencyKey).where(
+                models.IdempotencyKey.key == key, models.IdempotencyKey.created_at < cutoff
+            ))
+            db.commit()
+            return None
+
+        self._cache.put(key, stored)
+        return stored
+
+    def save(self, db: Session, key: str, stored: StoredResponse) -> None:
+        """
+        Record a response in the caller's transaction (no commit).
+        Raises IntegrityError if another request already claimed the key.
+        """
+        db.execute(insert(models.IdempotencyKey).values(
+            key=key,
+            request_hash=stored.request_hash,
+            status_code=stored.status_code,
+            response_body=stored.body,
+            created_at=stored.created_at,
+        ))
+
+    def remember(self, key: str, stored: StoredResponse) -> None:
+        """Put a committed response in the LRU"""
+        self._cache.put(key, stored)
+
+    def purge_expired(self, db: Session) -> int:
+        """Delete expired keys and commit; returns how many were removed"""
+        cutoff = utcnow() - self.ttl
+        result = db.execute(delete(models.IdempotencyKey).where(models.IdempotencyKey.created_at < cutoff))
+        db.commit()
+        self._cache.clear()
+        return result.rowcount
+
+
+# Shared store for the process
+idempotency_store = IdempotencyStore(
+    settings.idempotency_cache_size, timedelta(hours=settings.idempotency_ttl_hours)
+)
+
+
+def create_loan_with_key(db: Session, loan: dict, key: str, request_hash: str):
+    """Create a loan and record its response under `key`, in the same transaction"""
+    created = crud.create_loan(db, loan)
+    stored = StoredResponse(request_hash, 201, created.model_dump_json(), utcnow())
+    idempotency_store.save(db, key, stored)
+    return created, stored
+
+
+def replay(stored: StoredResponse, request_hash: str) -> Response:
+    """Return the original response recorded for an idempotency key"""
+    if stored.request_hash != request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    return Response(content=stored.body, status_code=stored.status_code, media_type="application/json",
+                    headers={"Idempotent-Replayed": "true"})
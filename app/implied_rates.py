@@ -0,0 +1,201 @@
+"""
+Implied interest rates: the rate at which each loan's stored monthly payment
+exactly amortizes its amount over its term, to audit the stored
+`interest_rate` against.
+
+The annuity payment (see app/payments.py) has no closed-form inverse, so the
+monthly rate r solving
+
+    h(r) = A * r * q / (q - 1) = P,    q = (1 + r)^n
+
+is found with Newton's method. h is increasing and convex in r, and the
+starting point r0 = 2 * (n * P / A - 1) / (n + 1) (from h(r) ~ A / n * (1 + r * (n + 1) / 2))
+lies above the root, so the iterates descend onto it without overshooting.
+All loans are iterated together as NumPy arrays; a per-element mask drops
+each loan from the working set as soon as it converges, so the remaining
+iterations only touch the loans still moving.
+
+Stored payments are rounded to cents, which alone moves the implied rate by
+up to half a cent's worth of rate; that amount ("rounding") is allowed on top
+of the audit tolerance. Loans whose payment cannot repay the amount at any
+non-negative rate are reported as unsolvable.
+
+Usable outside the API, e.g. from audit_rates.py:
+
+    from app.database import engine
+    from app.implied_rates import iter_rate_audit
+
+    with engine.connect() as conn:
+        for loans, discrepancies in iter_rate_audit(conn):
+            ...
+"""
+
+import heapq
+from typing import Iterator
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+
+from app import models
+from app.filters import LoanFilters
+
+# Loans solved per block when auditing the book
+AUDIT_CHUNK_SIZE = 10_000
+
+# Newton stops once a step moves the monthly rate by less than this
+RATE_TOLERANCE = 1e-13
+MAX_ITERATIONS = 50
+
+# Default allowed difference between stored and implied rate, in percentage points
+AUDIT_TOLERANCE = 0.01
+
+AUDIT_COLUMNS = (
+    "id", "amount", "length_months", "monthly_payment",
+    "interest_rate", "implied_rate", "difference", "status",
+)
+
+AUDIT_QUERY = select(
+    models.Loan.id,
+    models.Loan.amount,
+    models.Loan.interest_rate,
+    models.Loan.length_months,
+    models.Loan.monthly_payment,
+).order_by(models.Loan.id)
+
+
+def _payment_and_slope(amount, months, rate):
+    """h(r) and dh/dr for monthly rates r > 0, stable for tiny r (expm1/log1p)"""
+    growth = np.expm1(months * np.log1p(rate))  # q - 1
+    ratio = (growth + 1) / growth  # q / (q - 1)
+    payment = amount * rate * ratio
+    slope = amount * (ratio - rate * months * ratio / ((1 + rate) * growth))
+    return payment, slope
+
+
+def solve_implied_rates(amount, length_months, monthly_payment, max_iterations: int = MAX_ITERATIONS) -> dict:
+    """
+    Implied annual interest rates (percent) for arrays of loans.
+
+    Returns a dict of arrays, one element per loan: "rate" (NaN if unsolvable
+    or not converged), "rounding" (how far the rate can move from rounding the
+    payment to cents, in percentage points) and "solvable" (False where the
+    payment does not cover the amount even at 0%).
+    """
+    amount = np.asarray(amount, dtype=float)
+    months = np.asarray(length_months, dtype=float)
+    payment = np.asarray(monthly_payment, dtype=float)
+
+    rate = np.full(amount.shape, np.nan)
+    slope = np.full(amount.shape, np.nan)
+
+    # At 0% the payment is A / n; within rounding of that, the rate is zero.
+    # The slack (relative to the amount) keeps payments rounded on a half-cent
+    # boundary inside the band despite float error (cf. the 1e-9 in payments.check_payments).
+    excess = payment * months - amount
+    zero = np.abs(excess) <= 0.005 * months + 1e-9 * amount
+    rate[zero] = 0.0
+    slope[zero] = amount[zero] * (months[zero] + 1) / (2 * months[zero])
+    solvable = zero | (excess > 0)
+
+    active = np.flatnonzero(solvable & ~zero)
+    r = 2 * (payment[active] * months[active] / amount[active] - 1) / (months[active] + 1)
+    for _ in range(max_iterations):
+        if not active.size:
+            break
+        h, dh = _payment_and_slope(amount[active], months[active], r)
+        # Never step past half the current rate, in case rounding puts r0 below the root
+        r_next = np.maximum(r - (h - payment[active]) / dh, r / 2)
+        done = np.abs(r_next - r) <= RATE_TOLERANCE
+        rate[active[done]] = r_next[done]
+        slope[active[done]] = dh[done]
+        active, r = active[~done], r_next[~done]
+
+    return {
+        "rate": rate * 1200,
+        "rounding": 0.005 / slope * 1200,
+        "solvable": solvable,
+    }
+
+
+def audit_chunk(ids, amount, interest_rate, length_months, monthly_payment, tolerance: float) -> list[dict]:
+    """
+    Compare stored and implied rates for a block of loans (1-D arrays).
+    Returns a row per discrepancy, keyed by AUDIT_COLUMNS.
+    """
+    solved = solve_implied_rates(amount, length_months, monthly_payment)
+    difference = solved["rate"] - interest_rate
+    unsolved = np.isnan(solved["rate"])
+    flagged = unsolved | (np.abs(difference) > tolerance + solved["rounding"])
+
+    rows = []
+    for position in np.flatnonzero(flagged):
+        if not solved["solvable"][position]:
+            status = "unsolvable"
+        elif unsolved[position]:
+            status = "not_converged"
+        else:
+            status = "mismatch"
+        rows.append(dict(zip(AUDIT_COLUMNS, (
+            int(ids[position]),
+            float(amount[position]),
+            int(length_months[position]),
+            float(monthly_payment[position]),
+            float(interest_rate[position]),
+            None if unsolved[position] else round(float(solved["rate"][position]), 4),
+            None if unsolved[position] else round(float(difference[position]), 4),
+            status,
+        ))))
+    return rows
+
+
+def iter_rate_audit(
+    conn: Connection,
+    tolerance: float = AUDIT_TOLERANCE,
+    chunk_size: int = AUDIT_CHUNK_SIZE,
+    filters: LoanFilters | None = None,
+) -> Iterator[tuple[int, list[dict]]]:
+    """
+    Audit all loans (or those matching `filters`) in ID order, `chunk_size`
+    at a time. Yields (loans in the chunk, discrepancies in the chunk).
+    """
+    stmt = AUDIT_QUERY
+    if filters is not None:
+        stmt = stmt.where(*filters.conditions())
+    result = conn.execute(stmt.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        block = np.array(rows, dtype=float)
+        ids, amount, interest_rate, length_months, monthly_payment = block.T
+        yield len(block), audit_chunk(ids, amount, interest_rate, length_months, monthly_payment, tolerance)
+
+
+def rate_audit_report(
+    conn: Connection,
+    tolerance: float = AUDIT_TOLERANCE,
+    limit: int = 100,
+    chunk_size: int = AUDIT_CHUNK_SIZE,
+    filters: LoanFilters | None = None,
+) -> dict:
+    """
+    Response document for GET /portfolio/implied-rates: counts by status and
+    the `limit` largest discrepancies (unsolvable loans first).
+    """
+    loans = 0
+    counts = {"mismatch": 0, "unsolvable": 0, "not_converged": 0}
+    largest = []
+    for chunk_loans, discrepancies in iter_rate_audit(conn, tolerance, chunk_size, filters):
+        loans += chunk_loans
+        for row in discrepancies:
+            counts[row["status"]] += 1
+        largest = heapq.nlargest(limit, largest + discrepancies, key=_severity)
+    return {
+        "loans": loans,
+        "tolerance": tolerance,
+        "discrepancies": sum(counts.values()),
+        **counts,
+        "largest": largest,
+    }
+
+
+def _severity(row: dict) -> float:
+    return np.inf if row["difference"] is None else abs(row["difference"])
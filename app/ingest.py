@@ -0,0 +1,108 @@
+"""
+Incremental NDJSON ingest for POST /loans/ingest.
+
+The request body is parsed line by line as it arrives and handed to a
+`commit_chunk` callback every `chunk_size` lines, so memory stays flat no
+matter how large the upload is. The callback decides how rows are written
+(sync session in the threadpool, or an async session).
+"""
+
+import logging
+from typing import AsyncIterator, Awaitable, Callable
+
+from pydantic import ValidationError
+
+from app import schemas
+from app.payments import check_payments
+from app.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+# Longest single NDJSON line accepted
+MAX_LINE_BYTES = 64 * 1024
+
+
+async def ingest_ndjson(
+    body: AsyncIterator[bytes],
+    chunk_size: int,
+    commit_chunk: Callable[[list[dict]], Awaitable[list[int]]],
+) -> AsyncIterator[str]:
+    """
+    Validate NDJSON loans from `body` and commit them in chunks.
+
+    Yields one NDJSON progress record per committed chunk, then a summary
+    record. Failures after the response has started are reported in-band as an
+    {"error": ...} record; chunks committed before it stay committed.
+    """
+    state = {"chunk": 0, "first_line": 1, "line": 0, "last_id": None, "accepted": 0, "rejected": 0}
+    rows = []
+    row_lines = []
+    errors = []
+
+    def handle_line(raw: bytes):
+        state["line"] += 1
+        if not raw.strip():
+            return
+        try:
+            rows.append(schemas.LoanCreate.model_validate_json(raw).model_dump())
+            row_lines.append(state["line"])
+        except ValidationError as e:
+            errors.append({"line": state["line"],
+                           "errors": e.errors(include_url=False, include_context=False, include_input=False)})
+
+    async def flush():
+        # Check (or fill in) the chunk's monthly payments in one vectorized pass
+        mismatches = check_payments(rows)
+        for position in sorted(mismatches, reverse=True):
+            errors.append({"line": row_lines[position], "errors": [mismatches[position]]})
+            del rows[position]
+        errors.sort(key=lambda error: error["line"])
+
+        new_ids = await commit_chunk(rows) if rows else []
+        if new_ids:
+            state["last_id"] = new_ids[-1]
+        state["chunk"] += 1
+        state["accepted"] += len(new_ids)
+        state["rejected"] += len(errors)
+        record = {
+            "chunk": state["chunk"],
+            "first_line": state["first_line"],
+            "last_line": state["line"],
+            "accepted": len(new_ids),
+            "rejected": len(errors),
+            "last_id": state["last_id"],
+            "errors": list(errors),
+        }
+        state["first_line"] = state["line"] + 1
+        rows.clear()
+        row_lines.clear()
+        errors.clear()
+        return dumps(record) + b"\n"
+
+    try:
+        buffer = b""
+        async for data in body:
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for raw in lines:
+                handle_line(raw)
+                if state["line"] - state["first_line"] + 1 >= chunk_size:
+                    yield await flush()
+            if len(buffer) > MAX_LINE_BYTES:
+                raise ValueError(f"line {state['line'] + 1} exceeds {MAX_LINE_BYTES} bytes")
+
+        # The last line may not end with a newline
+        if buffer:
+            handle_line(buffer)
+        if state["line"] >= state["first_line"]:
+            yield await flush()
+
+        logger.info(f"NDJSON ingest complete: {state['accepted']} accepted, {state['rejected']} rejected")
+        yield dumps({"done": True, "lines": state["line"], "accepted": state["accepted"],
+                     "rejected": state["rejected"], "last_id": state["last_id"]}) + b"\n"
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band; earlier
+        # chunks stay committed and the client can resume after last_line
+        logger.error(f"NDJSON ingest aborted after line {state['first_line'] - 1}: {e}")
+        yield dumps({"error": str(e), "last_committed_line": state["first_line"] - 1,
+                     "last_id": state["last_id"]}) + b"\n"
@@ -1,7 +1,33 @@
-from fastapi import FastAPI, Depends, HTTPException
+from contextlib import asynccontextmanager
+from functools import partial
+from fastapi import APIRouter, FastAPI, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app import models, schemas
-from app.database import engine, get_db
+from starlette.concurrency import run_in_threadpool
+from app import crud, schemas
+from app.amortization import get_schedule, iter_schedule_ndjson, schedule_rows, schedule_summary
+from app.cache import loan_cache
+from app.compression import CompressionMiddleware
+from app.config import settings
+from app.database import SessionLocal, async_engine, engine, get_connection, get_db, pool_status
+from app.etag import etag_matches, list_etag, loan_etag, not_modified
+from app.export import EXPORT_CHUNK_SIZE, EXPORT_MEDIA_TYPES, iter_export
+from app.fieldsets import LOAN_FIELDS, columns_for, parse_fields, project
+from app.filters import LoanFilters, loan_filters, parse_sort
+from app.group_commit import GroupCommitUnavailable, group_committer, run_write
+from app.idempotency import create_loan_with_key, idempotency_store, replay, request_fingerprint
+from app.implied_rates import AUDIT_CHUNK_SIZE, AUDIT_TOLERANCE, rate_audit_report
+from app.ingest import ingest_ndjson
+from app.migrations import upgrade_schema
+from app.pagination import MAX_PAGE_SIZE, page_position, page_headers, set_next_cursor, set_total_count
+from app.payments import PaymentMismatch, check_payments
+from app.portfolio import PORTFOLIO_CHUNK_SIZE, portfolio_report, portfolio_schedule
+from app.responses import FastJSONResponse, RequestBodyStreamingResponse
+from app.stats import stats_report
 import logging
 
 # Configure logging
@@ -11,15 +37,58 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+# Create database tables, and add columns/indexes missing from an older database
+for step in upgrade_schema(engine):
+    logger.info(f"Schema upgrade: {step}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with SessionLocal() as db:
+        purged = idempotency_store.purge_expired(db)
+        crud.init_loan_stats(db)
+    if purged:
+        logger.info(f"Purged {purged} expired idempotency key(s)")
+    if group_committer is not None:
+        group_committer.start()
+        logger.info(f"Group commit enabled: window={settings.group_commit_window_ms}ms, "
+                    f"max_batch={settings.group_commit_max_batch}")
+    yield
+    if group_committer is not None:
+        group_committer.stop()
+
 
 app = FastAPI(
     title="LoanStreet Loan Management API",
     description="API for managing loan records with create, read, and update operations",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Compress large responses (list pages, exports) for clients that accept it
+if settings.compression:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+
+@app.exception_handler(RequestValidationError)
+async def validation_error(request: Request, exc: RequestValidationError):
+    """
+    FastAPI's 422 response, encoded with orjson: the errors echo the input,
+    and a JSON Infinity/NaN literal would make the standard encoder raise.
+    """
+    return FastJSONResponse(status_code=422, content={"detail": jsonable_encoder(exc.errors())})
+
+
+@app.exception_handler(GroupCommitUnavailable)
+async def group_commit_unavailable(request: Request, exc: GroupCommitUnavailable):
+    """A write that the group commit writer could not take or finish in time"""
+    logger.error(f"Group commit unavailable: {exc}")
+    return FastJSONResponse(status_code=503, content={"detail": str(exc)})
+
+
+# Loan endpoints (sync). In async mode (LOANS_ASYNC_DB=1) the equivalent
+# routes from app/async_routes.py are served instead, see the bottom of this file.
+router = APIRouter()
+
 
 @app.get("/")
 def read_root():
@@ -27,92 +96,412 @@ def read_root():
     return {"message": "LoanStreet Loan Management API is running"}
 
 
-@app.post("/loans", response_model=schemas.LoanResponse, status_code=201)
-def create_loan(loan: schemas.LoanCreate, db: Session = Depends(get_db)):
+@app.get("/metrics/group-commit")
+def group_commit_metrics():
+    """Batch size and added latency of group commit, for tuning its window"""
+    if group_committer is None:
+        return {"enabled": False}
+    return group_committer.stats()
+
+
+@app.get("/metrics/pool")
+def pool_metrics():
+    """Live connection pool checkout/overflow counts, for sizing the pool"""
+    metrics = {"engine": pool_status(engine)}
+    if async_engine is not None:
+        metrics["async_engine"] = pool_status(async_engine.sync_engine)
+    return metrics
+
+
+@app.get("/metrics/cache")
+def cache_metrics():
+    """Hit, miss and eviction counters of the GET /loans/{loan_id} cache"""
+    return loan_cache.stats()
+
+
+@router.post("/loans", response_model=schemas.LoanResponse, status_code=201)
+def create_loan(
+    loan: schemas.LoanCreate,
+    db: Session = Depends(get_db),
+    idempotency_key: str | None = Header(None, max_length=255),
+):
     """
     Create a new loan with the following properties:
     - Amount
     - Interest rate
     - Length of loan in months
     - Monthly payment amount
+
+    Send an `Idempotency-Key` header to make retries safe: a repeated key returns
+    the original response instead of creating another loan.
     """
     logger.info(f"Creating loan: amount={loan.amount}, rate={loan.interest_rate}, months={loan.length_months}")
     
     # Step 1: Pydantic validates & creates object (see schemas.py)
     # loan = LoanCreate(...)  # Pydantic object
 
-    # Step 2: Convert to dict
+    # Step 2: Convert to dict, computing or checking the monthly payment
     loan_dict = loan.model_dump()
+    payment_errors = check_payments([loan_dict])
+    if payment_errors:
+        logger.warning(f"Loan rejected: {payment_errors[0]['msg']}")
+        raise HTTPException(status_code=422, detail=list(payment_errors.values()))
+
+    if idempotency_key is None:
+        # Step 3: Insert it and commit (alone, or batched with concurrent writes)
+        created = run_write(db, partial(crud.create_loan, loan=loan_dict))
+        logger.info(f"Loan created successfully with ID: {created.id}")
+        return created
+
+    # Step 3 (with a key): replay the original response if this is a retry...
+    request_hash = request_fingerprint(loan_dict)
+    stored = idempotency_store.lookup(db, idempotency_key)
+    if stored is None:
+        # ...otherwise insert the loan and the key together
+        try:
+            created, stored = run_write(db, partial(
+                create_loan_with_key, loan=loan_dict, key=idempotency_key, request_hash=request_hash
+            ))
+        except IntegrityError:
+            # A concurrent request with the same key committed first
+            stored = idempotency_store.lookup(db, idempotency_key)
+            if stored is None:
+                raise
+        else:
+            idempotency_store.remember(idempotency_key, stored)
+            logger.info(f"Loan created successfully with ID: {created.id}")
+            return created
+
+    logger.info(f"Replaying response for Idempotency-Key: {idempotency_key}")
+    return replay(stored, request_hash)
+
+
+@router.post("/loans/batch", response_model=schemas.LoanBatchResponse, status_code=201)
+def create_loans_batch(batch: schemas.LoanBatchCreate, db: Session = Depends(get_db)):
+    """
+    Create many loans in a single transaction.
 
-    # Step 3: Create SQLAlchemy object (in memory only!)
-    db_loan = models.Loan(**loan_dict)  # SQLAlchemy object, not in db yet!
+    Every item is validated against the same rules as POST /loans. Invalid items
+    are reported by index and skipped, unless `all_or_nothing` is set, in which
+    case nothing is inserted and the errors are returned with a 422.
+    """
+    logger.info(f"Creating loan batch: size={len(batch.loans)}, all_or_nothing={batch.all_or_nothing}")
+
+    # Step 1: Validate every item, remembering the position of the good ones
+    valid_rows, valid_indexes, errors = batch.validate_items()
+
+    if errors and batch.all_or_nothing:
+        logger.warning(f"Loan batch rejected: {len(errors)} invalid item(s)")
+        raise HTTPException(status_code=422, detail=[error.model_dump() for error in errors])
+
+    # Step 2: Insert all valid rows with one statement, in one transaction
+    new_ids = crud.create_loans(db, valid_rows)
+    db.commit()
+
+    # Step 3: Map the generated IDs back onto the submitted positions
+    logger.info(f"Loan batch created: {len(new_ids)} created, {len(errors)} rejected")
+    return schemas.LoanBatchResponse.from_results(len(batch.loans), valid_indexes, new_ids, errors)
+
+
+def _commit_ingest_chunk(db: Session, rows: list[dict]) -> list[int]:
+    """Insert and commit one chunk of ingested loans (runs in the threadpool)"""
+    try:
+        new_ids = crud.create_loans(db, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return new_ids
+
+
+@router.post("/loans/ingest")
+async def ingest_loans(request: Request, chunk_size: int = Query(5000, ge=1, le=100_000)):
+    """
+    Create loans from an NDJSON request body (one LoanCreate object per line).
+
+    The body is read incrementally and committed every `chunk_size` lines, so
+    server memory stays flat regardless of upload size. The response is an NDJSON
+    stream with one progress record per committed chunk:
+    - first_line / last_line: 1-based line range covered by the chunk
+    - accepted / rejected: row counts, with per-line validation errors
+    - last_id: ID of the last loan committed so far
+
+    After a dropped connection, everything up to the last received `last_line`
+    is durable, so a client can resume by re-sending the remaining lines.
+    """
+    logger.info(f"Starting NDJSON ingest: chunk_size={chunk_size}")
+
+    async def progress():
+        db = SessionLocal()
+        try:
+            commit_chunk = partial(run_in_threadpool, _commit_ingest_chunk, db)
+            async for record in ingest_ndjson(request.stream(), chunk_size, commit_chunk):
+                yield record
+        finally:
+            db.close()
+
+    return RequestBodyStreamingResponse(progress(), media_type="application/x-ndjson")
+
+
+@router.get("/loans/export")
+def export_loans(
+    format: str = Query("ndjson", pattern="^(ndjson|json)$"),
+    chunk_size: int = Query(EXPORT_CHUNK_SIZE, ge=1, le=50_000),
+):
+    """
+    Stream every loan, ordered by ID, as NDJSON (default) or one JSON array.
+
+    Rows are read through a streaming cursor and serialized `chunk_size` at a
+    time, so memory stays flat regardless of the size of the loan book.
+    """
+    logger.info(f"Exporting loans: format={format}, chunk_size={chunk_size}")
+    return StreamingResponse(iter_export(format, chunk_size), media_type=EXPORT_MEDIA_TYPES[format])
+
+
+@router.post("/loans/lookup", response_model=schemas.LoanLookupResponse)
+def lookup_loans(lookup: schemas.LoanLookup, db: Session = Depends(get_db)):
+    """
+    Get many loans by ID in one request.
 
-    # Step 4: Put it in the database
-    db.add(db_loan)      # stage for insertion in memory
-    db.commit()          # now it's in the database!
-    db.refresh(db_loan)  # get the auto-generated ID back
+    Loans are returned in the order of the requested IDs (duplicates included);
+    IDs with no loan are reported in `missing` rather than failing the call.
+    """
+    logger.info(f"Looking up {len(lookup.ids)} loan ID(s)")
+    
+    # One WHERE id IN (...) query per chunk of IDs, instead of one query per loan
+    found = crud.get_loans_by_ids(db, lookup.ids)
+    
+    loans = [found[loan_id] for loan_id in lookup.ids if loan_id in found]
+    missing = [loan_id for loan_id in dict.fromkeys(lookup.ids) if loan_id not in found]
     
-    logger.info(f"Loan created successfully with ID: {db_loan.id}")
-    return db_loan       # Return the SQLAlchemy object, FastAPI will convert to JSON using Pydantic schema
+    logger.info(f"Lookup found {len(found)} loan(s), {len(missing)} missing")
+    return schemas.LoanLookupResponse(loans=loans, missing=missing)
+
+
+@router.get("/loans/stats", response_model=schemas.LoanStats)
+def get_loan_stats(db: Session = Depends(get_db)):
+    """
+    Portfolio totals: loan count, total principal, principal-weighted average
+    rate, average term, and the same per term bucket.
 
+    Served from running sums that every create and update adjusts in its own
+    transaction (see app/stats.py), so this is a fixed-size read.
+    """
+    return stats_report(crud.get_loan_stats(db))
+
+
+@router.get("/loans/{loan_id}", response_model=schemas.LoanResponse)
+def get_loan(
+    loan_id: int,
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,monthly_payment"),
+    if_none_match: str | None = Header(None),
+    conn: Connection = Depends(get_connection),
+):
+    """
+    Get a loan by its unique identifier.
+
+    The response carries a strong `ETag`; send it back in `If-None-Match` to get
+    a bodyless 304 Not Modified while the loan is unchanged. Use `fields` to
+    receive (and read from the database) only some of the loan's fields.
 
-@app.get("/loans/{loan_id}", response_model=schemas.LoanResponse)
-def get_loan(loan_id: int, db: Session = Depends(get_db)):
-    """Get a loan by its unique identifier"""
+    Reads go through a bare pooled connection rather than a Session.
+    """
     logger.info(f"Retrieving loan with ID: {loan_id}")
+    fields = parse_fields(fields)
     
-    # Query the database for the loan with the given ID using SQLAlchemy
-    db_loan = db.query(models.Loan).filter(models.Loan.id == loan_id).first()
+    # Serve from the in-process cache when we can
+    loan = loan_cache.get(loan_id)
+    if loan is None:
+        if if_none_match:
+            # A conditional request only needs the version (an index-only read)
+            version = crud.get_loan_version(conn, loan_id)
+            if version is not None and etag_matches(if_none_match, loan_etag(loan_id, version, fields)):
+                return not_modified(loan_etag(loan_id, version, fields))
+
+        # Otherwise SELECT just the columns we will return
+        generation = loan_cache.generation
+        loan = crud.get_loan_columns(conn, loan_id, columns_for(fields or LOAN_FIELDS))
+        
+        # If no loan is found, raise a 404 error
+        if loan is None:
+            logger.warning(f"Loan not found: ID {loan_id}")
+            raise HTTPException(status_code=404, detail="Loan not found")
+        
+        # Cache full rows, unless a write invalidated the cache while we were reading
+        if not fields:
+            loan_cache.put(loan_id, loan, generation=generation)
+    
+    etag = loan_etag(loan.id, loan.version, fields)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     
-    # If no loan is found, raise a 404 error
-    if db_loan is None:
+    # Serialize the row straight to JSON bytes (no LoanResponse round trip)
+    logger.info(f"Loan retrieved successfully: ID {loan_id}")
+    return FastJSONResponse(project(loan, fields or LOAN_FIELDS), headers={"ETag": etag})
+
+
+@router.get("/loans/{loan_id}/schedule")
+def get_loan_schedule(
+    loan_id: int,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    conn: Connection = Depends(get_connection),
+):
+    """
+    Month-by-month amortization schedule of a loan: payment, principal,
+    interest and remaining balance for every month until it is paid off.
+
+    `format=ndjson` streams one month per line instead of a single JSON document.
+    """
+    logger.info(f"Building amortization schedule: ID {loan_id}, format={format}")
+    loan = loan_cache.get(loan_id) or crud.get_loan_columns(conn, loan_id, LOAN_FIELDS)
+    if loan is None:
         logger.warning(f"Loan not found: ID {loan_id}")
         raise HTTPException(status_code=404, detail="Loan not found")
     
-    logger.info(f"Loan retrieved successfully: ID {loan_id}")
-    # If found, return the loan object (FastAPI will convert it to JSON using the response_model schema)
-    return db_loan
+    # Vectorized, and cached by the loan's terms
+    schedule = get_schedule(loan.amount, loan.interest_rate, loan.length_months, loan.monthly_payment)
+    if format == "ndjson":
+        return StreamingResponse(iter_schedule_ndjson(schedule), media_type="application/x-ndjson")
+    return FastJSONResponse({**schedule_summary(loan_id, schedule), "schedule": schedule_rows(schedule)})
 
 
-@app.put("/loans/{loan_id}", response_model=schemas.LoanResponse)
-def update_loan(loan_id: int, loan: schemas.LoanUpdate, db: Session = Depends(get_db)):
+@router.put("/loans/{loan_id}", response_model=schemas.LoanResponse)
+def update_loan(loan_id: int, loan: schemas.LoanUpdate, response: Response, db: Session = Depends(get_db)):
     """Update an existing loan by its unique identifier"""
     logger.info(f"Updating loan with ID: {loan_id}")
     
-    # Query the database for the loan with the given ID using SQLAlchemy
-    db_loan = db.query(models.Loan).filter(models.Loan.id == loan_id).first()
+    # Get only fields that were provided in the request (exclude unset fields)
+    update_data = loan.model_dump(exclude_unset=True)
+    logger.info(f"Updating fields: {list(update_data.keys())}")
+    
+    # Apply the provided fields and commit (alone, or batched with concurrent writes)
+    try:
+        updated = run_write(db, partial(crud.update_loan, loan_id=loan_id, changes=update_data))
+    except PaymentMismatch as e:
+        logger.warning(f"Loan update rejected: ID {loan_id}: {e}")
+        raise HTTPException(status_code=422, detail=[e.error])
+    # The change is committed: drop any cached copy so it is never served stale
+    loan_cache.pop(loan_id)
     
     # if no loan is found, raise a 404 error
-    if db_loan is None:
+    if updated is None:
         logger.warning(f"Loan not found for update: ID {loan_id}")
         raise HTTPException(status_code=404, detail="Loan not found")
     
-    # if a loan is found, update only provided fields
-    update_data = loan.model_dump(exclude_unset=True) # Get only fields that were provided in the request (exclude unset fields)
-    logger.info(f"Updating fields: {list(update_data.keys())}")
-    
-    # Set the provided fields on the db_loan object
-    for key, value in update_data.items():
-        setattr(db_loan, key, value)
-    
-    db.commit()
-    db.refresh(db_loan)
-    
     logger.info(f"Loan updated successfully: ID {loan_id}")
-    return db_loan
+    response.headers["ETag"] = loan_etag(updated.id, updated.version)
+    return updated
+
+
+@router.get("/loans", response_model=list[schemas.LoanResponse])
+def list_loans(
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Page size; use /loans/export for the full book"),
+    cursor: str | None = Query(None, description="X-Next-Cursor value from the previous page"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Use cursor instead; deep offsets are slow"),
+    sort: str = Query("id", description="Column to order by, prefixed with - for descending, e.g. -amount"),
+    filters: LoanFilters = Depends(loan_filters),
+    count: str | None = Query(None, pattern="^(exact|estimated)$", description="Add an X-Total-Count header"),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,monthly_payment"),
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    List loans one page at a time, ordered by ID or by `sort`.
+
+    Filter with `<column>=` for an exact match or `<column>_min=` /
+    `<column>_max=` for an inclusive range on amount, interest_rate,
+    length_months and monthly_payment; the common combinations are served by
+    composite indexes.
+
+    When more loans follow, the response carries an `X-Next-Cursor` header;
+    pass it back as `cursor` to fetch the next page. Every page costs the same
+    index seek regardless of depth.
 
+    The page's `ETag` changes whenever a loan on it does; send it back in
+    `If-None-Match` to get a 304 Not Modified without the body.
 
-@app.get("/loans", response_model=list[schemas.LoanResponse])
-def list_loans(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """List all loans"""
-    logger.info(f"Listing loans: skip={skip}, limit={limit}")
+    Use `fields` to receive (and read from the database) only some fields.
+
+    Pass `count=exact` for the number of matching loans in `X-Total-Count`:
+    unfiltered totals come from the loan_stats sums, filtered ones from an index
+    count. `count=estimated` samples the table instead for filtered queries
+    and marks the header with `X-Total-Count-Estimated: true`.
+    """
+    logger.info(f"Listing loans: cursor={cursor}, skip={skip}, limit={limit}, sort={sort}, filters={filters.key()}, fields={fields}")
+    sort_field, _ = parse_sort(sort)
+    after = page_position(cursor, skip, sort)
+    fields = parse_fields(fields)
+    
+    # Query one extra row to find out whether another page follows
+    columns = columns_for(fields or LOAN_FIELDS, sort_field)
+    loans = crud.list_loans(db, limit + 1, skip=skip, sort=sort, after=after, columns=columns, filters=filters)
+    loans = set_next_cursor(response, loans, limit, sort)
+    if count:
+        set_total_count(response, *crud.count_loans(db, filters, estimated=count == "estimated"))
     
-    # Query the database for all loans using SQLAlchemy
-    loans = db.query(models.Loan).offset(skip).limit(limit).all()
+    # Skip serializing the page entirely if the client already has it
+    next_cursor = response.headers.get("X-Next-Cursor")
+    etag = list_etag(loans, ";".join([next_cursor or "", ",".join(fields or ()), response.headers.get("X-Total-Count", "")]))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, page_headers(response))
+    response.headers["ETag"] = etag
     
+    # Serialize the rows straight to JSON bytes (no LoanResponse round trip)
     logger.info(f"Retrieved {len(loans)} loans")
-    # Return the list of loans (FastAPI will convert to JSON using the response_model schema)
-    return loans
+    return FastJSONResponse([project(row, fields or LOAN_FIELDS) for row in loans], headers=dict(response.headers))
+
+
+@router.get("/portfolio/schedule")
+def get_portfolio_schedule(
+    chunk_size: int = Query(PORTFOLIO_CHUNK_SIZE, ge=1, le=50_000, description="Loans read per chunk"),
+    filters: LoanFilters = Depends(loan_filters),
+    conn: Connection = Depends(get_connection),
+):
+    """
+    Aggregate month-by-month cashflow of the whole loan book (or of the loans
+    matching the GET /loans filters): total payment, principal, interest,
+    outstanding balance and active loans per month.
+
+    Loans are read `chunk_size` at a time and amortized in vectorized blocks
+    sized by each loan's payoff month, so memory stays bounded however many
+    loans there are and however long their terms.
+    """
+    logger.info(f"Building portfolio schedule: chunk_size={chunk_size}, filters={filters.key()}")
+    schedule = portfolio_schedule(conn, chunk_size, filters)
+    logger.info(f"Portfolio schedule built: {schedule['loans']} loans, {len(schedule['month'])} months")
+    return FastJSONResponse(portfolio_report(schedule))
+
+
+@router.get("/portfolio/implied-rates")
+def get_implied_rates(
+    tolerance: float = Query(AUDIT_TOLERANCE, ge=0, description="Allowed difference in percentage points"),
+    limit: int = Query(100, ge=1, le=10_000, description="Largest discrepancies to return"),
+    chunk_size: int = Query(AUDIT_CHUNK_SIZE, ge=1, le=100_000, description="Loans solved per block"),
+    filters: LoanFilters = Depends(loan_filters),
+    conn: Connection = Depends(get_connection),
+):
+    """
+    Audit stored interest rates against the rates implied by each loan's
+    amount, term and monthly payment (or those of the loans matching the
+    GET /loans filters).
+
+    Implied rates are solved with vectorized Newton iterations over blocks of
+    `chunk_size` loans. Returns counts by status and the `limit` largest
+    discrepancies; `python audit_rates.py` writes all of them to a report.
+    """
+    logger.info(f"Auditing implied rates: tolerance={tolerance}, filters={filters.key()}")
+    report = rate_audit_report(conn, tolerance, limit, chunk_size, filters)
+    logger.info(f"Implied rate audit: {report['discrepancies']} discrepancies in {report['loans']} loans")
+    return FastJSONResponse(report)
+
+
+# Serve the async versions of the loan endpoints when configured
+if settings.async_db:
+    from app.async_routes import router as loan_router
+else:
+    loan_router = router
+app.include_router(loan_router)
 
 # @app.delete("/loans/{loan_id}", status_code=204)
 # def delete_loan(loan_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,84 @@
+"""
+Schema upgrades for existing databases.
+
+`create_all` creates missing tables but never alters existing ones, so a
+database created by an older version lacks the columns and indexes added
+since. upgrade_schema() runs on startup (and in the maintenance scripts) and
+brings such a database up to date in place, and installs the triggers that
+maintain the loan statistics (app/stats.py); every step checks first, so it
+is a no-op on a current database and safe to run from several workers.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex
+
+from app import models, stats
+
+# Columns added to loans after the first release, as (name, ADD COLUMN definition)
+ADDED_LOAN_COLUMNS = (
+    ("version", "version INTEGER NOT NULL DEFAULT 1"),
+)
+
+
+def upgrade_schema(engine: Engine) -> list[str]:
+    """
+    Create missing tables, then add missing loans columns, indexes and
+    statistics triggers. Returns a description of each step that changed the database.
+    """
+    models.Base.metadata.create_all(bind=engine)
+    applied = []
+    for name, definition in ADDED_LOAN_COLUMNS:
+        if name not in _loan_columns(engine):
+            _add_column(engine, name, definition)
+            applied.append(f"added column loans.{name}")
+
+    with engine.begin() as conn:
+        existing = {index["name"] for index in inspect(conn).get_indexes("loans")}
+        for index in models.Loan.__table__.indexes:
+            if index.name not in existing:
+                # IF NOT EXISTS: another worker may be creating it right now
+                conn.execute(CreateIndex(index, if_not_exists=True))
+                applied.append(f"created index {index.name}")
+
+    for name, statements in stats.trigger_ddl(engine.dialect.name).items():
+        if name not in _loan_triggers(engine):
+            _create_trigger(engine, name, statements)
+            applied.append(f"created trigger {name}")
+    return applied
+
+
+def _loan_columns(engine: Engine) -> set[str]:
+    with engine.connect() as conn:
+        return {column["name"] for column in inspect(conn).get_columns("loans")}
+
+
+def _add_column(engine: Engine, name: str, definition: str) -> None:
+    """ALTER TABLE loans ADD COLUMN, tolerating another worker having just added it"""
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE loans ADD COLUMN {definition}"))
+    except DBAPIError:
+        if name not in _loan_columns(engine):
+            raise
+
+
+def _loan_triggers(engine: Engine) -> set[str]:
+    query = {
+        "sqlite": "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'loans'",
+        "postgresql": "SELECT tgname FROM pg_trigger WHERE tgrelid = 'loans'::regclass AND NOT tgisinternal",
+    }[engine.dialect.name]
+    with engine.connect() as conn:
+        return set(conn.scalars(text(query)))
+
+
+def _create_trigger(engine: Engine, name: str, statements: list[str]) -> None:
+    """Create one trigger, tolerating another worker having just created it"""
+    try:
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+    except DBAPIError:
+        if name not in _loan_triggers(engine):
+            raise
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String
+from sqlalchemy import Column, DateTime, Index, Integer, Float, String, Text, func
 from app.database import Base
 
 
@@ -10,3 +10,42 @@ class Loan(Base):
     interest_rate = Column(Float, nullable=False)
     length_months = Column(Integer, nullable=False)
     monthly_payment = Column(Float, nullable=False)
+    # Bumped on every update; the ETag of a loan is built from (id, version)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        # Covers "SELECT version WHERE id = ?" so If-None-Match checks are index-only
+        Index("ix_loans_id_version", "id", "version"),
+        # Filter + sort on GET /loans: a range or equality on the leading column,
+        # ordered by (column, id), is an index range scan with no sort step
+        Index("ix_loans_amount_id", "amount", "id"),
+        Index("ix_loans_interest_rate_id", "interest_rate", "id"),
+        Index("ix_loans_monthly_payment_id", "monthly_payment", "id"),
+        # "Terms of N months, rate between x and y", ordered by rate
+        Index("ix_loans_length_months_interest_rate_id", "length_months", "interest_rate", "id"),
+    )
+
+
+class LoanStat(Base):
+    """
+    Running sums per term bucket for GET /loans/stats, kept up to date by every
+    loan write. The bucket counts also give the total for X-Total-Count.
+    """
+    __tablename__ = "loan_stats"
+
+    bucket = Column(String(16), primary_key=True)
+    loans = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Float, nullable=False, default=0.0)
+    rate_weighted = Column(Float, nullable=False, default=0.0)  # sum of amount * interest_rate
+    total_months = Column(Integer, nullable=False, default=0)
+
+
+class IdempotencyKey(Base):
+    """Original response of a POST /loans request, by its Idempotency-Key header"""
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(255), primary_key=True)  # primary key = indexed point lookup
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
@@ -0,0 +1,86 @@
+"""
+Opaque cursors for keyset pagination of GET /loans.
+
+A cursor records the sort key and the (sort value, id) of the last row of a
+page. The next page starts strictly after that position, so it is an index
+seek no matter how deep the client has paged, unlike OFFSET which has to
+scan and discard every skipped row.
+"""
+
+import base64
+import json
+import math
+
+from fastapi import HTTPException, Response
+
+# Hard cap on GET /loans?limit=; larger pulls should use GET /loans/export
+MAX_PAGE_SIZE = 1000
+
+# Response headers describing a page (besides its ETag)
+PAGE_HEADERS = ("X-Next-Cursor", "X-Total-Count", "X-Total-Count-Estimated")
+
+
+class InvalidCursor(ValueError):
+    """The cursor is malformed or was issued for a different sort order"""
+
+
+def encode_cursor(sort: str, value, loan_id: int) -> str:
+    """Build the cursor pointing just after the row (value, loan_id)"""
+    raw = json.dumps([sort, value, loan_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple:
+    """Return the (sort value, id) stored in a cursor issued for `sort`"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, loan_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if cursor_sort != sort:
+        raise InvalidCursor("Cursor does not match the requested sort order")
+    if not _is_number(value) or not _is_number(loan_id) or not isinstance(loan_id, int):
+        raise InvalidCursor("Malformed cursor")
+    return value, loan_id
+
+
+def _is_number(value) -> bool:
+    """Every sort column is numeric: accept finite ints and floats (bool is an int subclass, so exclude it)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def page_position(cursor: str | None, skip: int, sort: str = "id") -> tuple | None:
+    """Decode the keyset position of a list request, rejecting bad cursors with a 400"""
+    if cursor is None:
+        return None
+    if skip:
+        raise HTTPException(status_code=400, detail="Use either cursor or skip, not both")
+    try:
+        return decode_cursor(cursor, sort)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def set_next_cursor(response: Response, loans: list, limit: int, sort: str = "id") -> list:
+    """
+    Trim the extra look-ahead row from a page and, if there was one, point
+    X-Next-Cursor at the page's last row. `sort` may carry a "-" prefix for
+    descending order.
+    """
+    if len(loans) > limit:
+        loans = loans[:limit]
+        last = loans[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(sort, getattr(last, sort.removeprefix("-")), last.id)
+    return loans
+
+
+def set_total_count(response: Response, total: int, estimated: bool = False):
+    """Report the number of matching loans in X-Total-Count (flagging estimates)"""
+    response.headers["X-Total-Count"] = str(total)
+    if estimated:
+        response.headers["X-Total-Count-Estimated"] = "true"
+
+
+def page_headers(response: Response) -> dict:
+    """The paging headers set on `response`, to repeat on a 304 Not Modified"""
+    return {name: response.headers[name] for name in PAGE_HEADERS if name in response.headers}
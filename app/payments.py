@@ -0,0 +1,111 @@
+"""
+Monthly payment engine: the level (annuity) payment of a loan, and the
+policy for client-supplied payments on create and update.
+
+    P = A * r / (1 - (1 + r)^-n),   r = interest_rate / 100 / 12   (P = A / n at 0%)
+
+LOANS_PAYMENT_MODE decides what happens to a supplied `monthly_payment`:
+- off: stored as given
+- derive: replaced by the computed payment
+- validate: rejected if it differs from the computed payment by more than
+  LOANS_PAYMENT_TOLERANCE
+A missing payment is always computed. Everything here works on whole NumPy
+arrays, so checking a 100k-loan batch is one array computation.
+"""
+
+import numpy as np
+
+from app.config import settings
+
+PAYMENT_MODES = ("off", "derive", "validate")
+
+# Loan fields the payment is computed from
+PAYMENT_INPUTS = ("amount", "interest_rate", "length_months")
+
+if settings.payment_mode not in PAYMENT_MODES:
+    raise ValueError(f"Unknown payment mode '{settings.payment_mode}', expected one of {list(PAYMENT_MODES)}")
+
+
+class PaymentMismatch(ValueError):
+    """A supplied monthly payment is outside the tolerance in validate mode"""
+
+    def __init__(self, error: dict):
+        super().__init__(error["msg"])
+        self.error = error
+
+
+def annuity_payment(amount, interest_rate, length_months):
+    """Level monthly payment rounded to cents; accepts scalars or NumPy arrays"""
+    amount = np.asarray(amount, dtype=float)
+    rate = np.asarray(interest_rate, dtype=float) / 100 / 12
+    months = np.asarray(length_months, dtype=float)
+    has_rate = rate > 0
+    safe_rate = np.where(has_rate, rate, 1.0)
+    payment = np.where(has_rate, amount * safe_rate / (1 - (1 + safe_rate) ** -months), amount / months)
+    return np.round(payment, 2)
+
+
+def mismatch_error(given: float, expected: float, tolerance: float) -> dict:
+    """A validation error in the same shape as Pydantic's, for 422 responses"""
+    return {
+        "type": "payment_mismatch",
+        "loc": ["monthly_payment"],
+        "msg": f"Monthly payment {given} does not match the computed payment {expected} (tolerance {tolerance})",
+    }
+
+
+def check_payments(rows: list[dict], mode: str | None = None, tolerance: float | None = None) -> dict[int, dict]:
+    """
+    Apply the payment mode to loan rows in place, in one vectorized pass.
+
+    Missing (None) payments are filled in, and in derive mode every payment is
+    replaced. In validate mode, returns {position in rows: error} for the
+    rows whose payment is out of tolerance; those rows are left unchanged.
+    """
+    mode = mode or settings.payment_mode
+    tolerance = settings.payment_tolerance if tolerance is None else tolerance
+    if not rows:
+        return {}
+    missing = np.fromiter((row.get("monthly_payment") is None for row in rows), dtype=bool, count=len(rows))
+    if mode == "off" and not missing.any():
+        return {}
+
+    expected = annuity_payment(
+        *(np.fromiter((row[name] for row in rows), dtype=float, count=len(rows)) for name in PAYMENT_INPUTS)
+    )
+    given = np.fromiter(
+        (np.nan if row.get("monthly_payment") is None else row["monthly_payment"] for row in rows),
+        dtype=float, count=len(rows),
+    )
+
+    replace = missing | (mode == "derive")
+    for position in np.flatnonzero(replace):
+        rows[position]["monthly_payment"] = float(expected[position])
+
+    if mode != "validate":
+        return {}
+    bad = ~missing & (np.abs(given - expected) > tolerance + 1e-9)
+    return {
+        int(position): mismatch_error(float(given[position]), float(expected[position]), tolerance)
+        for position in np.flatnonzero(bad)
+    }
+
+
+def update_needs_check(changes: dict) -> bool:
+    """Whether a partial update has to be resolved against the loan's current values"""
+    if "monthly_payment" in changes and changes["monthly_payment"] is None:
+        return True  # explicit null: recompute the payment
+    return settings.payment_mode != "off" and any(name in changes for name in (*PAYMENT_INPUTS, "monthly_payment"))
+
+
+def resolve_update(current: dict, changes: dict) -> dict:
+    """
+    Apply the payment mode to a partial update of a loan whose current values
+    are `current`. Returns the changes to write, including the resulting
+    payment; raises PaymentMismatch in validate mode.
+    """
+    merged = {**current, **changes}
+    errors = check_payments([merged])
+    if errors:
+        raise PaymentMismatch(errors[0])
+    return {**changes, "monthly_payment": merged["monthly_payment"]}
@@ -0,0 +1,174 @@
+"""
+Portfolio-wide amortization: the aggregate monthly cashflow of every loan.
+
+Loans are read in chunks of `chunk_size` rows straight into NumPy arrays.
+Each chunk is amortized as 2-D (loans x months) arrays using the same
+closed-form balance as app/amortization.py, then reduced to per-month
+totals and added to the running result. A loan only needs columns up to its
+payoff month (or the end of its term, if sooner), so within a chunk loans
+are sorted by that horizon and split into blocks of at most
+PORTFOLIO_BLOCK_CELLS loan-months: a few long loans never blow up a block
+of short ones, and memory stays bounded however large the book is.
+
+Usable outside the API, e.g. from a month-end job:
+
+    from app.database import engine
+    from app.portfolio import portfolio_schedule
+
+    with engine.connect() as conn:
+        totals = portfolio_schedule(conn)
+"""
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+
+from app import models
+from app.amortization import payoff_month
+from app.filters import LoanFilters
+
+# Loans read from the database per chunk
+PORTFOLIO_CHUNK_SIZE = 2_000
+
+# Loan-months per 2-D block: 2,000 loans x 480 months, ~7.7 MB per array
+PORTFOLIO_BLOCK_CELLS = 2_000 * 480
+
+PORTFOLIO_COLUMNS = ("month", "payment", "principal", "interest", "balance", "active_loans")
+
+PORTFOLIO_QUERY = select(
+    models.Loan.amount,
+    models.Loan.interest_rate,
+    models.Loan.length_months,
+    models.Loan.monthly_payment,
+)
+
+
+def loan_horizons(amount, interest_rate, length_months, monthly_payment):
+    """Months each loan needs in a schedule: its term, or its payoff month if that is sooner"""
+    return np.minimum(length_months, payoff_month(amount, interest_rate, monthly_payment)).astype(int)
+
+
+def horizon_blocks(horizons, max_cells: int = PORTFOLIO_BLOCK_CELLS):
+    """
+    Split loans into blocks of similar horizon with at most `max_cells`
+    loan-months each (a lone loan longer than that gets its own block).
+    Yields arrays of positions into `horizons`.
+    """
+    order = np.argsort(horizons, kind="stable")
+    sorted_horizons = horizons[order]
+    start = 0
+    while start < len(order):
+        # Sorted ascending, so a block's size in cells is its length x its last horizon
+        cells = np.arange(1, len(order) - start + 1) * sorted_horizons[start:]
+        stop = start + max(1, int(np.searchsorted(cells, max_cells, side="right")))
+        yield order[start:stop]
+        start = stop
+
+
+def amortize_chunk(amount, interest_rate, length_months, monthly_payment) -> dict:
+    """
+    Amortize a block of loans at once; every argument is a 1-D array with one
+    element per loan. Returns per-month totals over the block, as arrays as
+    long as the block's latest payoff (or end of term).
+    """
+    loan_horizon = loan_horizons(amount, interest_rate, length_months, monthly_payment)[:, None]
+    horizon = int(loan_horizon.max())
+    months = np.arange(1, horizon + 1)[None, :]
+    rate = (interest_rate / 100 / 12)[:, None]
+    amount = amount[:, None]
+    payment = monthly_payment[:, None]
+    term = length_months[:, None]
+
+    # Balance after each payment, loans x months (closed form; straight-line at 0%).
+    # Months past a loan's own horizon are masked out below; holding the
+    # exponent there keeps (1 + r)^k from overflowing for short, high-rate loans.
+    has_rate = rate > 0
+    growth = (1 + rate) ** np.minimum(months, loan_horizon)
+    balance = np.where(
+        has_rate,
+        amount * growth - payment * (growth - 1) / np.where(has_rate, rate, 1.0),
+        amount - payment * months,
+    )
+    opening = np.concatenate((amount, balance[:, :-1]), axis=1)
+
+    # Each loan's last month: the end of its term, or the month it is paid off early
+    paid_off = balance <= 0
+    first_paid_off = np.where(paid_off.any(axis=1), paid_off.argmax(axis=1) + 1, horizon)
+    last_month = np.minimum(term[:, 0], first_paid_off)[:, None]
+    active = months <= last_month
+    final = months == last_month
+
+    interest = np.where(active, opening * rate, 0.0)
+    # The final payment settles the remaining balance, as in compute_schedule()
+    principal = np.where(final, opening, np.where(active, payment - interest, 0.0))
+    balance = np.where(months < last_month, balance, 0.0)
+
+    return {
+        "principal": principal.sum(axis=0),
+        "interest": interest.sum(axis=0),
+        "balance": balance.sum(axis=0),
+        "active_loans": active.sum(axis=0),
+    }
+
+
+def portfolio_schedule(
+    conn: Connection,
+    chunk_size: int = PORTFOLIO_CHUNK_SIZE,
+    filters: LoanFilters | None = None,
+) -> dict:
+    """
+    Aggregate amortization schedule of all loans (or those matching `filters`).
+
+    Returns a dict with "loans" (how many were included) and, per month,
+    arrays of total "payment", "principal", "interest", outstanding
+    "balance" after the month's payments, and "active_loans" still paying.
+    """
+    stmt = PORTFOLIO_QUERY
+    if filters is not None:
+        stmt = stmt.where(*filters.conditions())
+    result = conn.execute(stmt.execution_options(yield_per=chunk_size))
+
+    totals = {name: np.zeros(0) for name in ("principal", "interest", "balance", "active_loans")}
+    loans = 0
+    for rows in result.partitions():
+        block = np.array(rows, dtype=float)
+        loans += len(block)
+        amount, interest_rate, length_months, monthly_payment = block.T
+        length_months = length_months.astype(int)
+        horizons = loan_horizons(amount, interest_rate, length_months, monthly_payment)
+        for part in horizon_blocks(horizons):
+            chunk = amortize_chunk(amount[part], interest_rate[part], length_months[part], monthly_payment[part])
+            for name, values in chunk.items():
+                # Grow the running totals if this block runs longer
+                if len(values) > len(totals[name]):
+                    totals[name] = np.pad(totals[name], (0, len(values) - len(totals[name])))
+                totals[name][:len(values)] += values
+
+    months = len(totals["principal"])
+    return {
+        "loans": loans,
+        "month": np.arange(1, months + 1),
+        "payment": totals["principal"] + totals["interest"],
+        **totals,
+    }
+
+
+def portfolio_rows(schedule: dict) -> list[dict]:
+    """A portfolio schedule as a list of per-month row dicts, money rounded to cents"""
+    columns = [
+        schedule["month"].tolist(),
+        *(np.round(schedule[name], 2).tolist() for name in ("payment", "principal", "interest", "balance")),
+        schedule["active_loans"].astype(int).tolist(),
+    ]
+    return [dict(zip(PORTFOLIO_COLUMNS, values)) for values in zip(*columns)]
+
+
+def portfolio_report(schedule: dict) -> dict:
+    """Response document for GET /portfolio/schedule"""
+    return {
+        "loans": schedule["loans"],
+        "months": len(schedule["month"]),
+        "total_principal": round(float(schedule["principal"].sum()), 2),
+        "total_interest": round(float(schedule["interest"].sum()), 2),
+        "schedule": portfolio_rows(schedule),
+    }
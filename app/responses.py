@@ -0,0 +1,48 @@
+"""
+Custom response classes used by the API.
+"""
+
+import json
+
+from starlette.responses import JSONResponse, StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # optional: the standard json module is used instead
+    orjson = None
+
+
+def dumps(content) -> bytes:
+    """Encode `content` as compact JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class RequestBodyStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose body iterator is still reading the request body.
+
+    The default StreamingResponse listens for a client disconnect on older ASGI
+    servers by calling `receive()` in the background, which would swallow the
+    request body chunks we are still consuming. Here the body iterator is the
+    only reader of `receive()`, and a disconnect surfaces through request.stream().
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson when it is installed.
+
+    Routes return this directly with plain dicts built from database rows, so
+    FastAPI skips re-validating them through the response_model and the body
+    is encoded to bytes in one call. Falls back to the standard json module.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -3,13 +3,28 @@ Pydantic schemas for loan data validation and conversion to object.
 
 These schemas define the shape of data for different operations:
 - LoanBase: Common fields shared across operations
-- LoanCreate: For creating new loans (all fields required)
+- LoanCreate: For creating new loans (monthly_payment may be left to the server)
 - LoanUpdate: For updating loans (all fields optional for partial updates)
 - LoanResponse: For API responses (includes auto-generated ID)
+- LoanBatchCreate / LoanBatchResponse: For creating many loans in one request
+- LoanLookup / LoanLookupResponse: For fetching many loans by ID in one request
+- LoanStats: Portfolio totals and term buckets for GET /loans/stats
 """
 
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict, ValidationError, field_validator
+from typing import Any, Optional
+
+from app.payments import check_payments
+
+# Maximum number of loans accepted by a single POST /loans/batch request
+MAX_BATCH_SIZE = 10_000
+
+# Maximum number of IDs accepted by a single POST /loans/lookup request
+MAX_LOOKUP_IDS = 10_000
+
+# Longest accepted loan term (100 years). Schedules and the portfolio engine
+# allocate arrays per month of term, so the term must be bounded.
+MAX_LENGTH_MONTHS = 1200
 
 
 class LoanBase(BaseModel):
@@ -18,16 +33,26 @@ class LoanBase(BaseModel):
     Field(...) - Ellipsis makes fields required (must be in JSON)
     "gt=0" means the value must be greater than 0, 
     "ge=0" means it must be greater than or equal to 0
+    allow_inf_nan=False rejects "inf"/"nan", which would poison the running stats
     """
+    model_config = ConfigDict(allow_inf_nan=False)
+
     amount: float = Field(..., gt=0, description="Loan amount must be positive")
     interest_rate: float = Field(..., ge=0, description="Interest rate must be non-negative")
-    length_months: int = Field(..., gt=0, description="Loan length must be positive")
+    length_months: int = Field(
+        ..., gt=0, le=MAX_LENGTH_MONTHS, description=f"Loan length must be positive, at most {MAX_LENGTH_MONTHS} months"
+    )
     monthly_payment: float = Field(..., gt=0, description="Monthly payment must be positive")
 
 
 class LoanCreate(LoanBase):
-    """Schema for creating a new loan. Inherits all required fields from LoanBase."""
-    pass
+    """
+    Schema for creating a new loan. Inherits the fields of LoanBase, except that
+    the monthly payment may be omitted and computed by the server (see payments.py).
+    """
+    monthly_payment: float | None = Field(
+        None, gt=0, description="Monthly payment; omit to have it computed from the other fields"
+    )
 
 
 class LoanUpdate(BaseModel):
@@ -35,19 +60,143 @@ class LoanUpdate(BaseModel):
     Schema for updating an existing loan.
     All fields are optional to support partial updates.
     """
+    model_config = ConfigDict(allow_inf_nan=False)
+
     amount: float | None = Field(None, gt=0, description="Loan amount must be positive")
     interest_rate: float | None = Field(None, ge=0, description="Interest rate must be non-negative")
-    length_months: int | None = Field(None, gt=0, description="Loan length must be positive")
-    monthly_payment: float | None = Field(None, gt=0, description="Monthly payment must be positive")
+    length_months: int | None = Field(
+        None, gt=0, le=MAX_LENGTH_MONTHS, description=f"Loan length must be positive, at most {MAX_LENGTH_MONTHS} months"
+    )
+    monthly_payment: float | None = Field(
+        None, gt=0, description="Monthly payment must be positive; send null to recompute it"
+    )
+
+    @field_validator("amount", "interest_rate", "length_months", mode="before")
+    @classmethod
+    def reject_null(cls, value):
+        """Omit a field to leave it unchanged; only monthly_payment has a meaning for null"""
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
 
 
 class LoanResponse(LoanBase):
     """
     Schema for loan API responses.
-    Includes the database-generated ID and enables reading from ORM objects.
+    Includes the database-generated ID and version, and enables reading from ORM objects.
         
     """
     id: int  # ← Adds the 'id' field to the inherited fields
+    # Not capped on the way out: rows stored before MAX_LENGTH_MONTHS must still be readable
+    length_months: int
+    version: int = Field(..., description="Incremented on every update; used for the ETag")
 
     class Config:
         from_attributes = True  # Read from SQLAlchemy objects (what you have)
+        allow_inf_nan = True  # Rows stored before inputs were checked must still be readable
+
+
+class LoanBatchCreate(BaseModel):
+    """
+    Schema for creating many loans at once.
+    Items are left unvalidated (any JSON value, even a non-object) so each one
+    can be validated against LoanCreate individually and reported by index
+    instead of failing the whole request.
+    """
+    loans: list[Any] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_SIZE,
+        description="Loans to create, each with the same fields as POST /loans"
+    )
+    all_or_nothing: bool = Field(
+        False, description="Reject the whole batch if any loan fails validation"
+    )
+
+    def validate_items(self) -> tuple[list[dict], list[int], list["LoanBatchError"]]:
+        """
+        Validate every item against LoanCreate, then the batch's monthly
+        payments against the payment mode.
+        Returns the valid rows, their positions in `loans`, and per-index errors.
+        """
+        valid_rows = []
+        valid_indexes = []
+        errors = []
+        for index, item in enumerate(self.loans):
+            try:
+                valid_rows.append(LoanCreate.model_validate(item).model_dump())
+                valid_indexes.append(index)
+            except ValidationError as e:
+                errors.append(LoanBatchError(
+                    index=index, errors=e.errors(include_url=False, include_context=False)
+                ))
+
+        # Check (or fill in) every monthly payment in one vectorized pass
+        mismatches = check_payments(valid_rows)
+        if mismatches:
+            errors.extend(
+                LoanBatchError(index=valid_indexes[position], errors=[error])
+                for position, error in mismatches.items()
+            )
+            errors.sort(key=lambda error: error.index)
+            valid_rows = [row for position, row in enumerate(valid_rows) if position not in mismatches]
+            valid_indexes = [index for position, index in enumerate(valid_indexes) if position not in mismatches]
+        return valid_rows, valid_indexes, errors
+
+
+class LoanBatchError(BaseModel):
+    """Validation errors for a single item of a batch, identified by its index."""
+    index: int
+    errors: list[dict[str, Any]]
+
+
+class LoanBatchResponse(BaseModel):
+    """
+    Result of a batch create.
+    `ids` lines up with the submitted loans; rejected items are null.
+    """
+    ids: list[int | None]
+    created: int
+    errors: list[LoanBatchError]
+
+    @classmethod
+    def from_results(cls, size: int, valid_indexes: list[int], new_ids: list[int],
+                     errors: list[LoanBatchError]) -> "LoanBatchResponse":
+        """Map the generated IDs back onto the submitted positions"""
+        ids = [None] * size
+        for index, loan_id in zip(valid_indexes, new_ids):
+            ids[index] = loan_id
+        return cls(ids=ids, created=len(new_ids), errors=errors)
+
+
+class LoanLookup(BaseModel):
+    """Schema for fetching many loans by ID at once."""
+    ids: list[int] = Field(..., min_length=1, max_length=MAX_LOOKUP_IDS, description="Loan IDs to fetch")
+
+
+class LoanLookupResponse(BaseModel):
+    """
+    Result of a multi-ID lookup.
+    `loans` follows the order of the requested IDs; IDs that don't exist are
+    listed in `missing` instead of failing the whole request.
+    """
+    loans: list[LoanResponse]
+    missing: list[int]
+
+
+class TermBucketStats(BaseModel):
+    """Statistics of the loans whose term falls in one bucket (max_months null = open-ended)."""
+    bucket: str
+    min_months: int
+    max_months: int | None
+    loans: int
+    total_principal: float
+    average_rate: float | None = Field(..., description="Interest rate weighted by principal")
+    average_term_months: float | None
+
+
+class LoanStats(BaseModel):
+    """Portfolio-wide totals for GET /loans/stats; averages are null while there are no loans."""
+    loans: int
+    total_principal: float
+    average_rate: float | None = Field(..., description="Interest rate weighted by principal")
+    average_term_months: float | None
+    term_buckets: list[TermBucketStats]
@@ -0,0 +1,117 @@
+"""
+Portfolio statistics for GET /loans/stats, kept as running sums.
+
+The loan_stats table holds one row per term bucket with the number of loans
+and the sums of amount, amount * interest_rate and length_months. Triggers
+on the loans table (see trigger_ddl, installed by app/migrations.py) add
+every insert, update and delete's delta to those rows inside the writing
+statement, so the application issues no extra statements for them, and the
+endpoint reads TERM_BUCKETS rows and divides, however large the book is:
+
+    average rate = sum(amount * rate) / sum(amount)    (weighted by principal)
+    average term = sum(length_months) / loans
+
+If the sums ever drift (float rounding over millions of deltas, a write
+made while the triggers were missing), rebuild them from scratch with
+`python rebuild_stats.py`.
+"""
+
+from sqlalchemy import case
+
+from app import models
+
+# Term buckets as (name, first month, last month); the last one is open-ended
+TERM_BUCKETS = (
+    ("0-12", 1, 12),
+    ("13-60", 13, 60),
+    ("61-120", 61, 120),
+    ("121-180", 121, 180),
+    ("181-240", 181, 240),
+    ("241-360", 241, 360),
+    ("361+", 361, None),
+)
+
+STATS_SUMS = ("loans", "total_amount", "rate_weighted", "total_months")
+
+# Only changes to these columns move a loan's contribution to the sums
+_CHANGED = " OR ".join(f"OLD.{name} {{distinct}} NEW.{name}" for name in ("amount", "interest_rate", "length_months"))
+
+
+def term_bucket_column():
+    """SQL expression for the term bucket of each row of loans, for GROUP BY"""
+    return case(
+        *((models.Loan.length_months <= last, name) for name, _, last in TERM_BUCKETS[:-1]),
+        else_=TERM_BUCKETS[-1][0],
+    )
+
+
+def _apply_row(row: str, sign: str) -> str:
+    """UPDATE adding (sign "+") or removing (sign "-") trigger row `row` (NEW/OLD) to loan_stats"""
+    bucket = " ".join(f"WHEN {row}.length_months <= {last} THEN '{name}'" for name, _, last in TERM_BUCKETS[:-1])
+    return (
+        f"UPDATE loan_stats SET loans = loans {sign} 1, "
+        f"total_amount = total_amount {sign} {row}.amount, "
+        f"rate_weighted = rate_weighted {sign} {row}.amount * {row}.interest_rate, "
+        f"total_months = total_months {sign} {row}.length_months "
+        f"WHERE bucket = CASE {bucket} ELSE '{TERM_BUCKETS[-1][0]}' END;"
+    )
+
+
+def trigger_ddl(dialect: str) -> dict[str, list[str]]:
+    """
+    Statements creating each trigger that maintains loan_stats, by trigger
+    name, for a database dialect ("sqlite" or "postgresql"). The triggers
+    embed TERM_BUCKETS: after changing the buckets, drop them (startup
+    recreates them) and rebuild the stats.
+    """
+    add, remove = _apply_row("NEW", "+"), _apply_row("OLD", "-")
+    if dialect == "sqlite":
+        changed = _CHANGED.format(distinct="IS NOT")
+        return {
+            "loan_stats_insert": [f"CREATE TRIGGER IF NOT EXISTS loan_stats_insert AFTER INSERT ON loans BEGIN {add} END"],
+            "loan_stats_update": [
+                "CREATE TRIGGER IF NOT EXISTS loan_stats_update "
+                f"AFTER UPDATE OF amount, interest_rate, length_months ON loans WHEN {changed} "
+                f"BEGIN {remove} {add} END"
+            ],
+            "loan_stats_delete": [f"CREATE TRIGGER IF NOT EXISTS loan_stats_delete AFTER DELETE ON loans BEGIN {remove} END"],
+        }
+    if dialect == "postgresql":
+        changed = _CHANGED.format(distinct="IS DISTINCT FROM")
+        function = (
+            "CREATE OR REPLACE FUNCTION loan_stats_delta() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+            f"IF TG_OP IN ('UPDATE', 'DELETE') THEN {remove} END IF; "
+            f"IF TG_OP IN ('INSERT', 'UPDATE') THEN {add} END IF; "
+            "RETURN NULL; END $$"
+        )
+        execute = "FOR EACH ROW EXECUTE FUNCTION loan_stats_delta()"
+        return {
+            "loan_stats_insert": [function, f"CREATE TRIGGER loan_stats_insert AFTER INSERT ON loans {execute}"],
+            "loan_stats_update": [
+                function,
+                "CREATE TRIGGER loan_stats_update AFTER UPDATE OF amount, interest_rate, length_months ON loans "
+                f"FOR EACH ROW WHEN ({changed}) EXECUTE FUNCTION loan_stats_delta()",
+            ],
+            "loan_stats_delete": [function, f"CREATE TRIGGER loan_stats_delete AFTER DELETE ON loans {execute}"],
+        }
+    raise ValueError(f"No loan statistics triggers for database '{dialect}', expected sqlite or postgresql")
+
+
+def _summary(loans: int, total_amount: float, rate_weighted: float, total_months: int) -> dict:
+    return {
+        "loans": loans,
+        "total_principal": round(total_amount, 2),
+        "average_rate": round(rate_weighted / total_amount, 4) if total_amount else None,
+        "average_term_months": round(total_months / loans, 2) if loans else None,
+    }
+
+
+def stats_report(rows: dict[str, dict]) -> dict:
+    """Response document for GET /loans/stats from the loan_stats rows, by bucket name"""
+    empty = dict.fromkeys(STATS_SUMS, 0)
+    buckets = []
+    for name, first, last in TERM_BUCKETS:
+        sums = rows.get(name, empty)
+        buckets.append({"bucket": name, "min_months": first, "max_months": last, **_summary(**sums)})
+    totals = {name: sum(rows.get(bucket, empty)[name] for bucket, _, _ in TERM_BUCKETS) for name in STATS_SUMS}
+    return {**_summary(**totals), "term_buckets": buckets}
@@ -0,0 +1,41 @@
+"""
+Compare the sync (threadpool) and async request paths side by side.
+
+Starts a uvicorn server for each mode (LOANS_ASYNC_DB=0/1) on a fresh
+database in a temporary directory, then drives concurrent creates and gets
+against it with a pool of client threads.
+
+Run from the project root:
+    python -m benchmarks.async_vs_sync [--concurrency 32] [--requests 2000]
+"""
+
+import argparse
+import tempfile
+
+from benchmarks.http_load import LOAN, run_load, start_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests per test, {args.concurrency} concurrent clients\n")
+    print(f"{'mode':<8} {'POST /loans':>14} {'GET /loans/{id}':>16}")
+    for mode, env in (("sync", {"LOANS_ASYNC_DB": "0"}), ("async", {"LOANS_ASYNC_DB": "1"})):
+        with tempfile.TemporaryDirectory() as workdir:
+            server = start_server(args.port, env, workdir)
+            try:
+                base_url = f"http://127.0.0.1:{args.port}"
+                creates = run_load(base_url, "POST", "/loans", args.requests, args.concurrency, LOAN)
+                gets = run_load(base_url, "GET", "/loans/{id}", args.requests, args.concurrency)
+            finally:
+                server.terminate()
+                server.wait()
+        print(f"{mode:<8} {creates:>12,.0f}/s {gets:>14,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
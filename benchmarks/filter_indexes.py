@@ -0,0 +1,128 @@
+"""
+Time filtered and sorted GET /loans queries with and without the composite
+indexes on the loans table.
+
+A SQLite database is filled with synthetic loans, then each query shape runs
+through crud.list_loans (first page, and a later page via the keyset cursor)
+once with the filter indexes dropped and once with them in place. The query
+plan SQLite picked is printed next to each timing.
+
+Run from the project root:
+    python -m benchmarks.filter_indexes [--rows 1000000] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+from app.filters import FILTER_FIELDS, LoanFilters
+
+PAGE_SIZE = 100
+
+# Indexes this benchmark toggles: those leading with a filterable column
+FILTER_INDEXES = [index for index in models.Loan.__table__.indexes if index.columns[0].name in FILTER_FIELDS]
+
+QUERIES = [
+    ("rate 4-5%", "interest_rate", LoanFilters(interest_rate_min=4, interest_rate_max=5)),
+    ("360 months by rate", "interest_rate", LoanFilters(length_months=360)),
+    ("360 months, rate 4-5%", "interest_rate", LoanFilters(length_months=360, interest_rate_min=4, interest_rate_max=5)),
+    ("amount > $1M", "amount", LoanFilters(amount_min=1_000_000)),
+    ("largest amounts", "-amount", LoanFilters()),
+    ("payment 500-600", "monthly_payment", LoanFilters(monthly_payment_min=500, monthly_payment_max=600)),
+]
+
+
+def fill(engine, rows, chunk=50_000):
+    """Insert `rows` random loans"""
+    rng = random.Random(42)
+    terms = [60, 120, 180, 240, 360]
+    with engine.begin() as conn:
+        for start in range(0, rows, chunk):
+            batch = []
+            for _ in range(min(chunk, rows - start)):
+                amount = round(rng.lognormvariate(12, 1), 2)
+                batch.append({
+                    "amount": amount,
+                    "interest_rate": round(rng.uniform(2, 9), 3),
+                    "length_months": rng.choice(terms),
+                    "monthly_payment": round(amount / 200, 2),
+                })
+            conn.execute(insert(models.Loan), batch)
+
+
+def measure(SessionLocal, sort, filters, repeat):
+    """Average milliseconds for the first page and the page after it"""
+    with SessionLocal() as db:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            page = crud.list_loans(db, PAGE_SIZE, sort=sort, filters=filters)
+        first = (time.perf_counter() - started) / repeat * 1000
+
+        last = page[-1]
+        after = (getattr(last, sort.removeprefix("-")), last.id)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            crud.list_loans(db, PAGE_SIZE, sort=sort, after=after, filters=filters)
+        later = (time.perf_counter() - started) / repeat * 1000
+    return first, later
+
+
+def query_plan(engine, statement, parameters):
+    """SQLite's EXPLAIN QUERY PLAN for a statement, as one line"""
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return "; ".join(row[-1] for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_engine(f"sqlite:///{os.path.join(workdir, 'loans.db')}")
+        models.Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        started = time.perf_counter()
+        fill(engine, args.rows)
+        print(f"Inserted {args.rows:,} loans in {time.perf_counter() - started:.1f}s\n")
+
+        # Remember the last statement crud.list_loans ran, to explain it
+        last_query = {}
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if not statement.startswith("EXPLAIN"):
+                last_query.update(statement=statement, parameters=parameters)
+
+        results = {}
+        for indexed in (False, True):
+            for index in FILTER_INDEXES:
+                if indexed:
+                    index.create(bind=engine, checkfirst=True)
+                else:
+                    index.drop(bind=engine, checkfirst=True)
+            with engine.connect() as conn:
+                conn.exec_driver_sql("ANALYZE")
+
+            for name, sort, filters in QUERIES:
+                first, later = measure(SessionLocal, sort, filters, args.repeat)
+                results[name, indexed] = (first, later, query_plan(engine, **last_query))
+
+        print(f"{'query':<24} {'no index':>10} {'indexed':>10} {'next page':>10}  plan (indexed, next page)")
+        for name, _, _ in QUERIES:
+            unindexed, _, _ = results[name, False]
+            first, later, plan = results[name, True]
+            print(f"{name:<24} {unindexed:>8.2f}ms {first:>8.2f}ms {later:>8.2f}ms  {plan}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Helpers for the HTTP benchmarks: run the API under uvicorn in a temporary
+directory and drive it with concurrent clients.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+LOAN = {"amount": 250000.0, "interest_rate": 4.5, "length_months": 360, "monthly_payment": 1266.71}
+
+
+def start_server(port: int, env: dict, workdir: str, app: str = "app.main:app") -> subprocess.Popen:
+    """Start uvicorn with extra environment variables; the database is created in `workdir`"""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        cwd=workdir,
+        env={**os.environ, "PYTHONPATH": str(PROJECT_ROOT), **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(base_url, timeout=1)
+            return server
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def run_load(base_url: str, method: str, path: str, total: int, concurrency: int, json_body=None) -> float:
+    """
+    Send `total` requests from `concurrency` threads; returns requests per second.
+    `{id}` in `path` cycles through loan IDs 1-100.
+    """
+    local = threading.local()
+
+    def send(i):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        url = base_url + path.format(id=i % 100 + 1)
+        response = local.session.request(method, url, json=json_body)
+        response.raise_for_status()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(send, range(total)))
+    return total / (time.perf_counter() - started)
@@ -0,0 +1,71 @@
+"""
+Compare solving implied interest rates one loan at a time with the
+vectorized solver GET /portfolio/implied-rates and audit_rates.py use.
+
+- scalar: Newton's method per loan in a Python loop, with the same starting
+  point, step guard and stopping rule as app/implied_rates.py
+- vectorized: solve_implied_rates() over whole NumPy arrays, dropping each
+  loan from the working set once it converges
+
+Run from the project root:
+    python -m benchmarks.implied_rates [--loans 1000000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.implied_rates import MAX_ITERATIONS, RATE_TOLERANCE, solve_implied_rates
+from app.payments import annuity_payment
+
+# The scalar loop is timed on this many loans and scaled up
+SCALAR_SAMPLE = 20_000
+
+
+def scalar_rate(amount: float, months: int, payment: float) -> float:
+    """Implied annual rate (percent) of one loan that is solvable at a positive rate"""
+    rate = 2 * (months * payment / amount - 1) / (months + 1)
+    for _ in range(MAX_ITERATIONS):
+        growth = (1 + rate) ** months
+        value = amount * rate * growth / (growth - 1)
+        slope = amount * (growth / (growth - 1) - rate * months * growth / ((1 + rate) * (growth - 1) ** 2))
+        next_rate = max(rate - (value - payment) / slope, rate / 2)
+        if abs(next_rate - rate) <= RATE_TOLERANCE:
+            return next_rate * 1200
+        rate = next_rate
+    return float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loans", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    amount = rng.uniform(1_000, 1_000_000, args.loans)
+    interest_rate = np.round(rng.uniform(0.5, 12, args.loans), 2)
+    length_months = rng.integers(12, 481, args.loans)
+    monthly_payment = annuity_payment(amount, interest_rate, length_months)
+
+    sample = min(SCALAR_SAMPLE, args.loans)
+    started = time.perf_counter()
+    for i in range(sample):
+        scalar_rate(amount[i], int(length_months[i]), monthly_payment[i])
+    scalar = (time.perf_counter() - started) / sample * args.loans
+
+    started = time.perf_counter()
+    solved = solve_implied_rates(amount, length_months, monthly_payment)
+    vectorized = time.perf_counter() - started
+
+    error = np.abs(solved["rate"] - interest_rate) - solved["rounding"]
+    print(f"{args.loans:,} loans (scalar timed on {sample:,} and scaled)\n")
+    print(f"{'solver':<11} {'seconds':>9} {'loans/s':>13}")
+    print(f"{'scalar':<11} {scalar:>9.2f} {args.loans / scalar:>13,.0f}")
+    print(f"{'vectorized':<11} {vectorized:>9.2f} {args.loans / vectorized:>13,.0f}")
+    print(f"\nunsolved: {int(np.isnan(solved['rate']).sum())}, "
+          f"largest difference beyond payment rounding: {max(float(np.nanmax(error)), 0.0):.2e} points")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare the ways of turning a page of loans into a JSON response body.
+
+- response_model: ORM Loan objects validated into LoanResponse (from_attributes),
+  dumped to JSON-compatible dicts and rendered by JSONResponse, which is what
+  FastAPI does for a route that returns ORM objects with a response_model
+- fast path: Rows with only the needed columns, turned into dicts and rendered
+  by FastJSONResponse (orjson when installed), as GET /loans now does
+
+Run from the project root:
+    python -m benchmarks.json_responses [--page-size 1000] [--repeat 200]
+"""
+
+import argparse
+import time
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from starlette.responses import JSONResponse
+
+from app import crud, models, responses, schemas
+from app.fieldsets import LOAN_FIELDS, columns_for, project
+from app.responses import FastJSONResponse
+
+LOAN = {"amount": 250000.0, "interest_rate": 4.5, "length_months": 360, "monthly_payment": 1266.71}
+
+page_adapter = TypeAdapter(list[schemas.LoanResponse])
+
+
+def response_model_path(db, page_size):
+    loans = crud.list_loans(db, page_size)
+    validated = page_adapter.validate_python(loans, from_attributes=True)
+    return JSONResponse(page_adapter.dump_python(validated, mode="json")).body
+
+
+def fast_path(db, page_size):
+    rows = crud.list_loans(db, page_size, columns=columns_for(LOAN_FIELDS))
+    return FastJSONResponse([project(row, LOAN_FIELDS) for row in rows]).body
+
+
+def measure(SessionLocal, path, page_size, repeat):
+    """Average milliseconds per page, query included"""
+    with SessionLocal() as db:
+        body = path(db, page_size)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            path(db, page_size)
+        elapsed = time.perf_counter() - started
+    return elapsed / repeat * 1000, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Loan), [LOAN] * args.page_size)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    paths = [("response_model", response_model_path, True), ("fast path", fast_path, True)]
+    if responses.orjson is not None:
+        # The same fast path with the standard json encoder, to separate the two gains
+        paths.append(("fast path (json)", fast_path, False))
+
+    print(f"{args.page_size} loans per page, {args.repeat} pages each\n")
+    print(f"{'path':<18} {'ms/page':>9} {'bytes':>9}")
+    orjson = responses.orjson
+    for name, path, use_orjson in paths:
+        responses.orjson = orjson if use_orjson else None
+        elapsed, size = measure(SessionLocal, path, args.page_size, args.repeat)
+        print(f"{name:<18} {elapsed:>9.2f} {size:>9,}")
+    responses.orjson = orjson
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compare the Session/ORM read path for a single loan with the sessionless
+Core path GET /loans/{loan_id} now uses.
+
+- session: a Session from get_db, an ORM Query loading a Loan into the
+  identity map, validated into LoanResponse by the response_model
+- core: a pooled Connection from get_connection, the cached
+  SELECT ... WHERE id = :loan_id statement, the row written straight to JSON
+
+Both are timed in-process (database work only) and over HTTP, with the two
+routes served side by side by `bench_app` below under uvicorn.
+
+Run from the project root:
+    python -m benchmarks.read_path [--concurrency 8] [--requests 5000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import crud, models, schemas
+from app.database import get_connection, get_db
+from app.fieldsets import LOAN_FIELDS, project
+from app.responses import FastJSONResponse
+from benchmarks.http_load import LOAN, run_load, start_server
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/")
+def read_root():
+    return {}
+
+
+@bench_app.get("/session/{loan_id}", response_model=schemas.LoanResponse)
+def session_path(loan_id: int, db: Session = Depends(get_db)):
+    return crud.get_loan(db, loan_id)
+
+
+@bench_app.get("/core/{loan_id}", response_model=schemas.LoanResponse)
+def core_path(loan_id: int, conn: Connection = Depends(get_connection)):
+    return FastJSONResponse(project(crud.get_loan_columns(conn, loan_id, LOAN_FIELDS), LOAN_FIELDS))
+
+
+def in_process(engine, total):
+    """Reads per second of each path without HTTP (loan IDs 1-100)"""
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    started = time.perf_counter()
+    for i in range(total):
+        with SessionLocal() as db:
+            schemas.LoanResponse.model_validate(crud.get_loan(db, i % 100 + 1)).model_dump_json()
+    session = total / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for i in range(total):
+        with engine.connect() as conn:
+            FastJSONResponse(project(crud.get_loan_columns(conn, i % 100 + 1, LOAN_FIELDS), LOAN_FIELDS))
+    core = total / (time.perf_counter() - started)
+    return session, core
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database_url = f"sqlite:///{os.path.join(workdir, 'loans.db')}"
+        engine = create_engine(database_url)
+        models.Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(insert(models.Loan), [LOAN] * 100)
+
+        session, core = in_process(engine, args.requests)
+        print(f"{'path':<8} {'in-process reads/s':>19} {'HTTP requests/s':>16}")
+
+        server = start_server(args.port, {"LOANS_DATABASE_URL": database_url}, workdir, app="benchmarks.read_path:bench_app")
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            session_http = run_load(base_url, "GET", "/session/{id}", args.requests, args.concurrency)
+            core_http = run_load(base_url, "GET", "/core/{id}", args.requests, args.concurrency)
+        finally:
+            server.terminate()
+            server.wait()
+
+        print(f"{'session':<8} {session:>19,.0f} {session_http:>16,.0f}")
+        print(f"{'core':<8} {core:>19,.0f} {core_http:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
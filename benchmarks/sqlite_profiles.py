@@ -0,0 +1,53 @@
+"""
+Compare the SQLite PRAGMA presets (LOANS_SQLITE_PROFILE) on the API endpoints.
+
+For each preset a uvicorn server is started on a fresh database, then
+concurrent clients run creates, updates, gets, and a mixed workload where
+reads and writes overlap (which is where WAL helps most).
+
+Run from the project root:
+    python -m benchmarks.sqlite_profiles [--concurrency 16] [--requests 2000]
+"""
+
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from app.database import SQLITE_PROFILES
+from benchmarks.http_load import LOAN, run_load, start_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests per test, {args.concurrency} concurrent clients (requests/s)\n")
+    print(f"{'profile':<10} {'create':>9} {'update':>9} {'get':>9} {'mixed':>9}")
+    for profile in SQLITE_PROFILES:
+        with tempfile.TemporaryDirectory() as workdir:
+            server = start_server(args.port, {"LOANS_SQLITE_PROFILE": profile}, workdir)
+            try:
+                base_url = f"http://127.0.0.1:{args.port}"
+                create = run_load(base_url, "POST", "/loans", args.requests, args.concurrency, LOAN)
+                update = run_load(base_url, "PUT", "/loans/{id}", args.requests, args.concurrency,
+                                  {"interest_rate": 4.25})
+
+                # Mixed: half the clients write while the other half read
+                half = max(args.concurrency // 2, 1)
+                with ThreadPoolExecutor(2) as pool:
+                    writes = pool.submit(run_load, base_url, "POST", "/loans", args.requests // 2, half, LOAN)
+                    reads = pool.submit(run_load, base_url, "GET", "/loans/{id}", args.requests // 2, half)
+                    mixed = writes.result() + reads.result()
+
+                get = run_load(base_url, "GET", "/loans/{id}", args.requests, args.concurrency)
+            finally:
+                server.terminate()
+                server.wait()
+        print(f"{profile:<10} {create:>9,.0f} {update:>9,.0f} {get:>9,.0f} {mixed:>9,.0f}")
+
+
+if __name__ == "__main__":
+    main()
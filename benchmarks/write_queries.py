@@ -0,0 +1,101 @@
+"""
+Count the SQL statements issued per create/update request.
+
+Compares the original ORM write path (add/commit/refresh and
+load/setattr/commit/refresh) with the RETURNING-based helpers in app/crud.py.
+
+The GET /loans/stats sums are maintained by triggers on the loans table
+(installed here as on startup, see app/migrations.py), so they cost no extra
+statements on either path: a create or an update is one INSERT/UPDATE ...
+RETURNING. Only with LOANS_PAYMENT_MODE=derive/validate does an update of
+amount, rate or term lock and read the row first (crud.lock_loan), for 2.
+
+Run from the project root:
+    python -m benchmarks.write_queries
+"""
+
+import itertools
+import sqlite3
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+from app.migrations import upgrade_schema
+
+LOAN = {"amount": 250000.0, "interest_rate": 4.5, "length_months": 360, "monthly_payment": 1266.71}
+REQUESTS = 2000
+
+
+def legacy_create(db, loan):
+    db_loan = models.Loan(**loan)
+    db.add(db_loan)
+    db.commit()
+    db.refresh(db_loan)
+    return db_loan
+
+
+def legacy_update(db, loan_id, changes):
+    db_loan = db.query(models.Loan).filter(models.Loan.id == loan_id).first()
+    for key, value in changes.items():
+        setattr(db_loan, key, value)
+    db.commit()
+    db.refresh(db_loan)
+    return db_loan
+
+
+def returning_create(db, loan):
+    result = crud.create_loan(db, loan)
+    db.commit()
+    return result
+
+
+def returning_update(db, loan_id, changes):
+    result = crud.update_loan(db, loan_id, changes)
+    db.commit()
+    return result
+
+
+def measure(name, request):
+    """Run `request` REQUESTS times, each in a fresh session, on a fresh database"""
+    engine = create_engine("sqlite://")
+    upgrade_schema(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with SessionLocal() as db:
+        db.add(models.Loan(**LOAN))
+        db.commit()
+        crud.init_loan_stats(db)
+
+    statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        nonlocal statements
+        statements += 1
+
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        with SessionLocal() as db:
+            request(db)
+    elapsed = time.perf_counter() - started
+
+    print(f"{name:<26} {statements / REQUESTS:>8.2f} {REQUESTS / elapsed:>12,.0f}")
+
+
+def main():
+    print(f"SQLite {sqlite3.sqlite_version} (RETURNING needs 3.35+), {REQUESTS} requests each\n")
+    print(f"{'path':<26} {'queries':>8} {'requests/s':>12}")
+    measure("create (legacy)", lambda db: legacy_create(db, LOAN))
+    measure("create (RETURNING)", lambda db: returning_create(db, LOAN))
+    # Use a different rate each time so every update really changes the row
+    rates = itertools.count(1)
+    measure("update rate (legacy)", lambda db: legacy_update(db, 1, {"interest_rate": next(rates) / 1000}))
+    measure("update rate (RETURNING)", lambda db: returning_update(db, 1, {"interest_rate": next(rates) / 1000}))
+    payments = itertools.count(1)
+    measure("update payment (RETURNING)", lambda db: returning_update(db, 1, {"monthly_payment": next(payments)}))
+
+
+if __name__ == "__main__":
+    main()
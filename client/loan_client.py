@@ -31,8 +31,9 @@ Example usage:
     print(f"Total loans: {len(loans)}")
 """
 
+import json
 import requests
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 
 class LoanClientError(Exception):
@@ -77,7 +78,8 @@ class LoanClient:
         amount: float,
         interest_rate: float,
         length_months: int,
-        monthly_payment: float
+        monthly_payment: Optional[float] = None,
+        idempotency_key: Optional[str] = None
     ) -> dict:
         """
         Create a new loan.
@@ -86,7 +88,10 @@ class LoanClient:
             amount: The loan amount (must be positive)
             interest_rate: The interest rate percentage (must be non-negative)
             length_months: The length of the loan in months (must be positive)
-            monthly_payment: The monthly payment amount (must be positive)
+            monthly_payment: The monthly payment amount (must be positive);
+                omit to have the server compute it
+            idempotency_key: Optional unique key; retrying with the same key
+                returns the original loan instead of creating a duplicate
         
         Returns:
             dict: The created loan object with its assigned ID
@@ -98,15 +103,76 @@ class LoanClient:
             "amount": amount,
             "interest_rate": interest_rate,
             "length_months": length_months,
-            "monthly_payment": monthly_payment
         }
+        if monthly_payment is not None:
+            payload["monthly_payment"] = monthly_payment
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
         response = self.session.post(
             f"{self.base_url}/loans",
             json=payload,
+            headers=headers,
+            timeout=self.timeout
+        )
+        return self._handle_response(response)
+    
+    def create_loans_batch(self, loans: list[dict], all_or_nothing: bool = False) -> dict:
+        """
+        Create many loans in a single request and transaction.
+        
+        Args:
+            loans: Loan dicts with the same fields as create_loan
+            all_or_nothing: If True, nothing is created when any loan is invalid
+        
+        Returns:
+            dict: The generated IDs (aligned with `loans`, None for rejected
+                items), the number created, and per-index validation errors
+        
+        Raises:
+            LoanClientError: If the request fails, or if all_or_nothing is set
+                and any loan is invalid
+        """
+        response = self.session.post(
+            f"{self.base_url}/loans/batch",
+            json={"loans": loans, "all_or_nothing": all_or_nothing},
             timeout=self.timeout
         )
         return self._handle_response(response)
     
+    def ingest_loans(self, loans: Iterable[dict], chunk_size: int = 5000) -> Iterator[dict]:
+        """
+        Stream loans to the server as NDJSON and yield its progress records.
+        
+        Loans are sent lazily, so `loans` can be a generator over a huge file.
+        The server commits every `chunk_size` lines; if the connection drops,
+        resume by re-sending the loans after the last received `last_line`.
+        
+        Args:
+            loans: Loan dicts with the same fields as create_loan
+            chunk_size: Number of lines the server commits at a time
+        
+        Yields:
+            dict: One progress record per committed chunk, then a summary
+        
+        Raises:
+            LoanClientError: If the request fails
+        """
+        body = (json.dumps(loan).encode() + b"\n" for loan in loans)
+        try:
+            with self.session.post(
+                f"{self.base_url}/loans/ingest",
+                params={"chunk_size": chunk_size},
+                data=body,
+                headers={"Content-Type": "application/x-ndjson"},
+                stream=True,
+                timeout=self.timeout
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line:
+                        yield json.loads(line)
+        except requests.exceptions.RequestException as e:
+            raise LoanClientError(f"Request failed: {str(e)}") from e
+    
     def get_loan(self, loan_id: int) -> dict:
         """
         Get a loan by its ID.
@@ -126,6 +192,103 @@ class LoanClient:
         )
         return self._handle_response(response)
     
+    def get_schedule(self, loan_id: int) -> dict:
+        """
+        Get the month-by-month amortization schedule of a loan.
+        
+        Args:
+            loan_id: The unique identifier of the loan
+        
+        Returns:
+            dict: Totals plus a "schedule" list of {month, payment, principal,
+                interest, balance} rows
+        
+        Raises:
+            LoanClientError: If the loan is not found or request fails
+        """
+        response = self.session.get(
+            f"{self.base_url}/loans/{loan_id}/schedule",
+            timeout=self.timeout
+        )
+        return self._handle_response(response)
+    
+    def get_portfolio_schedule(self, **filters) -> dict:
+        """
+        Get the aggregate monthly cashflow of the whole loan book.
+        
+        Args:
+            **filters: Restrict to matching loans, as for list_loans
+        
+        Returns:
+            dict: Loan count, totals and a per-month "schedule" of payment,
+                principal, interest, balance and active_loans
+        
+        Raises:
+            LoanClientError: If the request fails
+        """
+        response = self.session.get(
+            f"{self.base_url}/portfolio/schedule",
+            params=filters,
+            timeout=self.timeout
+        )
+        return self._handle_response(response)
+    
+    def get_implied_rates(self, tolerance: float = 0.01, limit: int = 100, **filters) -> dict:
+        """
+        Audit stored interest rates against the rates implied by each loan's
+        amount, term and monthly payment.
+        
+        Args:
+            tolerance: Allowed difference, in percentage points
+            limit: Number of largest discrepancies to return
+            **filters: Restrict to matching loans, as for list_loans
+        
+        Returns:
+            dict: Loan and discrepancy counts, and the "largest" discrepancies
+        
+        Raises:
+            LoanClientError: If the request fails
+        """
+        response = self.session.get(
+            f"{self.base_url}/portfolio/implied-rates",
+            params={"tolerance": tolerance, "limit": limit, **filters},
+            timeout=self.timeout
+        )
+        return self._handle_response(response)
+    
+    def get_stats(self) -> dict:
+        """
+        Get portfolio totals: loan count, total principal, average rate and term.
+        
+        Returns:
+            dict: The totals, plus the same per bucket under "term_buckets"
+        
+        Raises:
+            LoanClientError: If the request fails
+        """
+        response = self.session.get(f"{self.base_url}/loans/stats", timeout=self.timeout)
+        return self._handle_response(response)
+    
+    def lookup_loans(self, ids: list[int]) -> dict:
+        """
+        Get many loans by ID in a single request.
+        
+        Args:
+            ids: Loan IDs to fetch
+        
+        Returns:
+            dict: "loans" in the order of `ids`, and "missing" IDs that don't exist
+        
+        Raises:
+            LoanClientError: If the request fails
+        """
+        response = self.session.post(
+            f"{self.base_url}/loans/lookup",
+            json={"ids": ids},
+            timeout=self.timeout
+        )
+        return self._handle_response(response)
+    
     def update_loan(
         self,
         loan_id: int,
@@ -167,13 +330,25 @@ class LoanClient:
         )
         return self._handle_response(response)
     
-    def list_loans(self, skip: int = 0, limit: int = 100) -> list[dict]:
+    def list_loans(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        *,
+        cursor: Optional[str] = None,
+        sort: str = "id",
+        **filters
+    ) -> list[dict]:
         """
-        List all loans with pagination.
+        List one page of loans, ordered by ID or by `sort`.
         
         Args:
-            skip: Number of loans to skip (for pagination)
+            skip: Deprecated offset-based pagination; prefer cursor
             limit: Maximum number of loans to return
+            cursor: Position token from a previous page (see iter_loans)
+            sort: Column to order by, prefixed with "-" for descending
+            **filters: Server-side filters, e.g. length_months=360,
+                interest_rate_min=4, interest_rate_max=5
         
         Returns:
             list[dict]: List of loan objects
@@ -181,13 +356,94 @@ class LoanClient:
         Raises:
             LoanClientError: If the request fails
         """
+        params = {"limit": limit, "sort": sort, **filters}
+        if cursor is not None:
+            params["cursor"] = cursor
+        if skip:
+            params["skip"] = skip
         response = self.session.get(
             f"{self.base_url}/loans",
-            params={"skip": skip, "limit": limit},
+            params=params,
             timeout=self.timeout
         )
         return self._handle_response(response)
     
+    def iter_loans(self, page_size: int = 100, sort: str = "id", **filters) -> Iterator[dict]:
+        """
+        Iterate over every (matching) loan, following the server's page cursors.
+        
+        Args:
+            page_size: Number of loans fetched per request
+            sort: Column to order by, prefixed with "-" for descending
+            **filters: Server-side filters, as for list_loans
+        
+        Yields:
+            dict: Loan objects in `sort` order
+        
+        Raises:
+            LoanClientError: If a request fails
+        """
+        params = {"limit": page_size, "sort": sort, **filters}
+        while True:
+            response = self.session.get(
+                f"{self.base_url}/loans",
+                params=params,
+                timeout=self.timeout
+            )
+            yield from self._handle_response(response)
+            next_cursor = response.headers.get("X-Next-Cursor")
+            if not next_cursor:
+                return
+            params["cursor"] = next_cursor
+    
+    def count_loans(self, estimated: bool = False, **filters) -> int:
+        """
+        Count the loans matching `filters` (all loans if none are given).
+        
+        Args:
+            estimated: Accept a sampled estimate for filtered counts, which
+                stays cheap on very large tables
+            **filters: Server-side filters, as for list_loans
+        
+        Returns:
+            int: Number of matching loans (from the X-Total-Count header)
+        
+        Raises:
+            LoanClientError: If the request fails
+        """
+        params = {"limit": 1, "count": "estimated" if estimated else "exact", **filters}
+        response = self.session.get(
+            f"{self.base_url}/loans",
+            params=params,
+            timeout=self.timeout
+        )
+        self._handle_response(response)
+        return int(response.headers["X-Total-Count"])
+    
+    def export_loans(self) -> Iterator[dict]:
+        """
+        Stream every loan from the server without loading the book into memory.
+        
+        Yields:
+            dict: Loan objects in ID order
+        
+        Raises:
+            LoanClientError: If the request fails
+        """
+        try:
+            with self.session.get(
+                f"{self.base_url}/loans/export",
+                params={"format": "ndjson"},
+                stream=True,
+                timeout=self.timeout
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line:
+                        yield json.loads(line)
+        except requests.exceptions.RequestException as e:
+            raise LoanClientError(f"Request failed: {str(e)}") from e
+    
     def health_check(self) -> dict:
         """
         Check if the API server is running.
@@ -0,0 +1,47 @@
+"""
+Rebuild the portfolio statistics behind GET /loans/stats from scratch.
+
+The statistics are running sums adjusted by every loan write (see
+app/stats.py). Run this script to recompute them from the loans table if
+they were lost or drifted, e.g. after editing loans directly in the database.
+It is safe to run while the API is serving requests: loan writes that arrive
+during the rebuild wait for it to commit, then apply their changes on top.
+"""
+
+from app import crud
+from app.database import SessionLocal, engine
+from app.migrations import upgrade_schema
+from app.stats import stats_report
+
+
+def rebuild_stats():
+    """Recompute the loan_stats rows with one aggregate over the loans table"""
+
+    # Create tables if they don't exist, upgrading an older database
+    upgrade_schema(engine)
+
+    db = SessionLocal()
+
+    try:
+        before = stats_report(crud.get_loan_stats(db))
+        after = stats_report(crud.rebuild_loan_stats(db))
+        db.commit()
+        print(f"✓ Rebuilt statistics for {after['loans']} loan(s) "
+              f"(previously {before['loans']} loan(s), ${before['total_principal']:,.2f})")
+
+        print("\nLoans by term:")
+        for bucket in after["term_buckets"]:
+            print(f"  {bucket['bucket']:>8} months: {bucket['loans']} loan(s), "
+                  f"${bucket['total_principal']:,.2f}")
+
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Error rebuilding statistics: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("=== Rebuilding Loan Statistics ===\n")
+    rebuild_stats()
+    print("\n=== Done ===")
@@ -4,21 +4,23 @@ Seed the database with sample loan data for testing and demonstration.
 Run this script to populate the database with realistic loan examples.
 """
 
+from app import crud
 from app.database import SessionLocal, engine
-from app.models import Base, Loan
+from app.migrations import upgrade_schema
+from app.models import Loan
 
 
 def seed_database():
     """Add sample loan data to the database"""
     
-    # Create tables if they don't exist
-    Base.metadata.create_all(bind=engine)
+    # Create tables if they don't exist, upgrading an older database
+    upgrade_schema(engine)
     
     db = SessionLocal()
     
     try:
-        # Check if data already exists
-        existing_count = db.query(Loan).count()
+        # Check if data already exists (creating the loan statistics if needed)
+        existing_count = crud.init_loan_stats(db)
         if existing_count > 0:
             print(f"Database already has {existing_count} loan(s). Skipping seed.")
             return
@@ -57,11 +59,8 @@ def seed_database():
             },
         ]
         
-        # Add loans to database
-        for loan_data in sample_loans:
-            loan = Loan(**loan_data)
-            db.add(loan)
-        
+        # Add loans to database (this also keeps the loan statistics in step)
+        crud.create_loans(db, sample_loans)
         db.commit()
         print(f"✓ Successfully seeded database with {len(sample_loans)} sample loans!")
         
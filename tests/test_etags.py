@@ -0,0 +1,108 @@
+"""
+ETags and If-None-Match on GET /loans/{id} and GET /loans: an unchanged
+resource is a bodyless 304, a change to the loan produces a new ETag, and the
+weak ETag of a compressed response still matches.
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import unittest
+
+# The app reads its settings on import: point it at a throwaway database first
+_workdir = tempfile.mkdtemp()
+os.environ["LOANS_DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'loans.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+# A term no other test uses, so filtering on it isolates this test's loans
+TERM = 799
+LOANS = 40  # enough for a page well past the compression threshold
+IDENTITY = {"Accept-Encoding": "identity"}
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+class ETagTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(app)
+        cls.client.__enter__()
+        cls.ids = [
+            cls.client.post("/loans", json={"amount": 1000.0 + i, "interest_rate": 4.0, "length_months": TERM}).json()["id"]
+            for i in range(LOANS)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def get(self, url: str, etag: str | None = None, headers: dict = IDENTITY, **params):
+        conditional = {"If-None-Match": etag} if etag else {}
+        return self.client.get(url, params=params, headers={**headers, **conditional})
+
+    def test_single_loan_not_modified(self):
+        url = f"/loans/{self.ids[0]}"
+        response = self.get(url)
+        etag = response.headers["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+
+        cached = self.get(url, etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+        self.assertEqual(cached.headers["ETag"], etag)
+
+    def test_single_loan_changes_after_update(self):
+        url = f"/loans/{self.ids[1]}"
+        etag = self.get(url).headers["ETag"]
+        updated = self.client.put(url, json={"interest_rate": 4.5})
+        self.assertNotEqual(updated.headers["ETag"], etag)
+
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["interest_rate"], 4.5)
+        self.assertEqual(response.headers["ETag"], updated.headers["ETag"])
+        self.assertEqual(self.get(url, updated.headers["ETag"]).status_code, 304)
+
+    def test_sparse_fieldset_has_its_own_etag(self):
+        url = f"/loans/{self.ids[2]}"
+        full = self.get(url).headers["ETag"]
+        sparse = self.get(url, fields="id,amount")
+        self.assertNotEqual(sparse.headers["ETag"], full)
+        self.assertEqual(self.get(url, full, fields="id,amount").status_code, 200)
+        self.assertEqual(self.get(url, sparse.headers["ETag"], fields="id,amount").status_code, 304)
+
+    def test_list_page_not_modified(self):
+        page = {"length_months": TERM, "limit": 10}
+        response = self.get("/loans", **page)
+        etag = response.headers["ETag"]
+        cursor = response.headers["X-Next-Cursor"]
+
+        cached = self.get("/loans", etag, **page)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+        self.assertEqual(cached.headers["X-Next-Cursor"], cursor)
+
+        # Updating a loan on the page changes the page's ETag
+        self.client.put(f"/loans/{response.json()[3]['id']}", json={"amount": 5000.0})
+        self.assertEqual(self.get("/loans", etag, **page).status_code, 200)
+
+    def test_compressed_list_page_weak_etag_matches(self):
+        page = {"length_months": TERM, "limit": LOANS}
+        response = self.get("/loans", headers=GZIP, **page)
+        self.assertEqual(response.headers.get("Content-Encoding"), "gzip")
+        etag = response.headers["ETag"]
+        self.assertTrue(etag.startswith("W/"), etag)
+
+        # The weak tag from the gzip response validates either representation
+        self.assertEqual(self.get("/loans", etag, headers=GZIP, **page).status_code, 304)
+        self.assertEqual(self.get("/loans", etag, **page).status_code, 304)
+        # ...and the identity response carries the same tag, strong
+        self.assertEqual(self.get("/loans", **page).headers["ETag"], etag.removeprefix("W/"))
+
+
+if __name__ == "__main__":
+    unittest.main()
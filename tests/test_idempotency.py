@@ -0,0 +1,91 @@
+"""
+Idempotency-Key on POST /loans: a retry with the same key and body replays
+the original response without creating another loan, the same key with a
+different body is a 422, and an expired key creates a new loan.
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import unittest
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+# The app reads its settings on import: point it at a throwaway database first
+_workdir = tempfile.mkdtemp()
+os.environ["LOANS_DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'loans.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.idempotency import idempotency_store  # noqa: E402
+from app.main import app  # noqa: E402
+
+LOAN = {"amount": 12000.0, "interest_rate": 6.5, "length_months": 48}
+
+
+class IdempotencyKeyTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(app)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def post(self, key: str, loan: dict = LOAN):
+        return self.client.post("/loans", json=loan, headers={"Idempotency-Key": key})
+
+    def loan_count(self) -> int:
+        return self.client.get("/loans/stats").json()["loans"]
+
+    def test_retry_replays_the_original_response(self):
+        key = str(uuid.uuid4())
+        first = self.post(key)
+        self.assertEqual(first.status_code, 201, first.text)
+        before = self.loan_count()
+
+        retry = self.post(key)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry.headers.get("Idempotent-Replayed"), "true")
+        self.assertEqual(self.loan_count(), before)
+
+    def test_replay_survives_a_cold_cache(self):
+        key = str(uuid.uuid4())
+        first = self.post(key)
+        idempotency_store._cache.clear()  # as after a restart: read the key back from the table
+        retry = self.post(key)
+        self.assertEqual(retry.json()["id"], first.json()["id"])
+        self.assertEqual(retry.headers.get("Idempotent-Replayed"), "true")
+
+    def test_same_key_with_a_different_body_is_rejected(self):
+        key = str(uuid.uuid4())
+        self.assertEqual(self.post(key).status_code, 201)
+        before = self.loan_count()
+
+        response = self.post(key, {**LOAN, "amount": 13000.0})
+        self.assertEqual(response.status_code, 422)
+        self.assertIn("different request", response.json()["detail"])
+        self.assertEqual(self.loan_count(), before)
+
+    def test_expired_key_creates_a_new_loan(self):
+        key = str(uuid.uuid4())
+        first = self.post(key)
+        # A negative TTL puts the cutoff in the future: every stored key has expired
+        with mock.patch.object(idempotency_store, "ttl", timedelta(seconds=-1)):
+            again = self.post(key)
+        self.assertEqual(again.status_code, 201)
+        self.assertIsNone(again.headers.get("Idempotent-Replayed"))
+        self.assertNotEqual(again.json()["id"], first.json()["id"])
+
+        # The key now belongs to the new loan
+        retry = self.post(key)
+        self.assertEqual(retry.json()["id"], again.json()["id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
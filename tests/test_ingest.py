@@ -0,0 +1,82 @@
+"""
+POST /loans/ingest: the NDJSON body is committed every `chunk_size` lines,
+with one progress record per chunk and a summary record at the end; invalid
+lines are rejected by line number without failing their chunk.
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+# The app reads its settings on import: point it at a throwaway database first
+_workdir = tempfile.mkdtemp()
+os.environ["LOANS_DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'loans.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+LOAN = {"amount": 8000.0, "interest_rate": 3.0, "length_months": 36}
+
+
+def ndjson(*lines) -> bytes:
+    """An NDJSON body; dict lines are encoded, str lines are sent verbatim"""
+    return "".join((json.dumps(line) if isinstance(line, dict) else line) + "\n" for line in lines).encode()
+
+
+class IngestTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(app)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def ingest(self, body: bytes, chunk_size: int) -> list[dict]:
+        response = self.client.post("/loans/ingest", params={"chunk_size": chunk_size}, content=body)
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line) for line in response.content.splitlines()]
+
+    def test_chunk_progress_records(self):
+        records = self.ingest(ndjson(*[LOAN] * 5), chunk_size=2)
+        chunks, summary = records[:-1], records[-1]
+
+        self.assertEqual([(c["chunk"], c["first_line"], c["last_line"]) for c in chunks], [(1, 1, 2), (2, 3, 4), (3, 5, 5)])
+        self.assertEqual([c["accepted"] for c in chunks], [2, 2, 1])
+        self.assertTrue(all(c["rejected"] == 0 and c["errors"] == [] for c in chunks))
+        self.assertEqual(summary, {"done": True, "lines": 5, "accepted": 5, "rejected": 0, "last_id": chunks[-1]["last_id"]})
+
+        # last_id points at the last committed loan, and every chunk advanced it
+        last_ids = [c["last_id"] for c in chunks]
+        self.assertEqual(last_ids, sorted(last_ids))
+        self.assertEqual(self.client.get(f"/loans/{summary['last_id']}").json()["amount"], LOAN["amount"])
+
+    def test_rejected_lines(self):
+        body = ndjson(LOAN, {**LOAN, "amount": -1}, "not json", LOAN, {"amount": 1.0})
+        records = self.ingest(body, chunk_size=3)
+        first, second, summary = records
+
+        self.assertEqual((first["accepted"], first["rejected"]), (1, 2))
+        self.assertEqual([error["line"] for error in first["errors"]], [2, 3])
+        self.assertEqual(first["errors"][0]["errors"][0]["loc"], ["amount"])
+
+        self.assertEqual((second["first_line"], second["last_line"]), (4, 5))
+        self.assertEqual((second["accepted"], second["rejected"]), (1, 1))
+        self.assertEqual(second["errors"][0]["line"], 5)
+
+        self.assertEqual((summary["lines"], summary["accepted"], summary["rejected"]), (5, 2, 3))
+
+    def test_blank_lines_and_missing_final_newline(self):
+        body = ndjson(LOAN, "", LOAN) + json.dumps(LOAN).encode()
+        summary = self.ingest(body, chunk_size=10)[-1]
+        self.assertEqual((summary["lines"], summary["accepted"], summary["rejected"]), (4, 3, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Cursor pagination of GET /loans: walking every page in either direction
+returns each matching loan exactly once, in (sort value, id) order, even when
+many loans share a sort value; a cursor that does not fit the request is a 400.
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import unittest
+
+# The app reads its settings on import: point it at a throwaway database first
+_workdir = tempfile.mkdtemp()
+os.environ["LOANS_DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'loans.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.pagination import encode_cursor  # noqa: E402
+
+# A term no other test uses, so filtering on it isolates this test's loans
+TERM = 797
+# Few distinct amounts, so most pages start and end inside a run of ties
+AMOUNTS = [500.0, 700.0, 500.0, 900.0, 700.0, 500.0, 700.0, 500.0, 900.0, 500.0, 700.0]
+
+
+class CursorPaginationTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(app)
+        cls.client.__enter__()
+        cls.loans = [
+            cls.client.post("/loans", json={"amount": amount, "interest_rate": 5.0, "length_months": TERM}).json()
+            for amount in AMOUNTS
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def walk(self, sort: str, limit: int) -> list[int]:
+        """IDs of every page of the test's loans, following X-Next-Cursor to the end"""
+        ids = []
+        params = {"sort": sort, "limit": limit, "length_months": TERM}
+        while True:
+            response = self.client.get("/loans", params=params)
+            self.assertEqual(response.status_code, 200, response.text)
+            page = response.json()
+            self.assertLessEqual(len(page), limit)
+            ids.extend(loan["id"] for loan in page)
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                return ids
+            params["cursor"] = cursor
+
+    def expected(self, field: str, descending: bool) -> list[int]:
+        ordered = sorted(self.loans, key=lambda loan: (loan[field], loan["id"]), reverse=descending)
+        return [loan["id"] for loan in ordered]
+
+    def test_ascending_with_ties(self):
+        for limit in (1, 2, 3, 4):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.walk("amount", limit), self.expected("amount", False))
+
+    def test_descending_with_ties(self):
+        for limit in (1, 2, 3, 4):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.walk("-amount", limit), self.expected("amount", True))
+
+    def test_by_id_both_directions(self):
+        self.assertEqual(self.walk("id", 3), self.expected("id", False))
+        self.assertEqual(self.walk("-id", 3), self.expected("id", True))
+
+    def test_cursor_for_another_sort_is_rejected(self):
+        response = self.client.get("/loans", params={"sort": "amount", "limit": 2, "length_months": TERM})
+        cursor = response.headers["X-Next-Cursor"]
+        for sort in ("-amount", "id", "interest_rate"):
+            with self.subTest(sort=sort):
+                response = self.client.get("/loans", params={"sort": sort, "cursor": cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("sort order", response.json()["detail"])
+
+    def test_malformed_cursors_are_rejected(self):
+        for cursor in ("not-a-cursor", encode_cursor("amount", "x", 1), encode_cursor("amount", 500.0, "1")):
+            with self.subTest(cursor=cursor):
+                response = self.client.get("/loans", params={"sort": "amount", "cursor": cursor})
+                self.assertEqual(response.status_code, 400)
+
+    def test_cursor_and_skip_are_exclusive(self):
+        response = self.client.get("/loans", params={"sort": "amount", "limit": 2, "length_months": TERM})
+        cursor = response.headers["X-Next-Cursor"]
+        response = self.client.get("/loans", params={"sort": "amount", "cursor": cursor, "skip": 1})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+GET /loans/stats must match a fresh aggregate of the loans table after
+concurrent writes to the same loans, and after a rebuild that runs while
+those writes are in flight.
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import random
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# The app reads its settings on import: point it at a throwaway database first
+_workdir = tempfile.mkdtemp()
+os.environ["LOANS_DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'loans.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import crud  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.stats import stats_report  # noqa: E402
+
+LOAN = {"amount": 1000.0, "interest_rate": 5.0, "length_months": 12}
+LOANS = 5
+UPDATES = 200
+
+
+def random_change() -> dict:
+    """A partial update of one statistics input (and sometimes a term bucket)"""
+    return random.choice([
+        {"amount": float(random.randint(100, 100_000))},
+        {"interest_rate": float(random.randint(0, 20))},
+        {"length_months": random.randint(1, 500)},
+        {"amount": float(random.randint(100, 100_000)), "length_months": random.randint(1, 500)},
+    ])
+
+
+class StatsConcurrencyTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(app)
+        cls.client.__enter__()
+        cls.ids = [cls.client.post("/loans", json=LOAN).json()["id"] for _ in range(LOANS)]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def put(self, i: int) -> int:
+        loan_id = self.ids[i % LOANS]
+        return self.client.put(f"/loans/{loan_id}", json=random_change()).status_code
+
+    def assert_stats_match_table(self):
+        served = self.client.get("/loans/stats").json()
+        with SessionLocal() as db:
+            expected = stats_report(crud.rebuild_loan_stats(db))
+            db.rollback()  # only compute, don't write
+        self.assertEqual(served["loans"], expected["loans"])
+        for name in ("total_principal", "average_rate", "average_term_months"):
+            self.assertAlmostEqual(served[name], expected[name], places=2, msg=name)
+        for bucket, expected_bucket in zip(served["term_buckets"], expected["term_buckets"]):
+            self.assertEqual(bucket["loans"], expected_bucket["loans"], msg=bucket["bucket"])
+            self.assertAlmostEqual(bucket["total_principal"], expected_bucket["total_principal"], places=2)
+
+    def test_concurrent_updates_of_the_same_loans(self):
+        with ThreadPoolExecutor(16) as pool:
+            codes = set(pool.map(self.put, range(UPDATES)))
+        self.assertEqual(codes, {200})
+        self.assert_stats_match_table()
+
+    def test_rebuild_during_concurrent_updates(self):
+        def rebuild(_):
+            with SessionLocal() as db:
+                crud.rebuild_loan_stats(db)
+                db.commit()
+
+        with ThreadPoolExecutor(16) as pool:
+            updates = pool.map(self.put, range(UPDATES))
+            rebuilds = pool.map(rebuild, range(5))
+            self.assertEqual(set(updates), {200})
+            list(rebuilds)
+        self.assert_stats_match_table()
+
+
+if __name__ == "__main__":
+    unittest.main()